@@ -3,93 +3,30 @@
 Build script for DiffGraph CLI using PyInstaller
 """
 
+import argparse
+import glob
+import importlib.util
+import shutil
 import subprocess
 import sys
 import os
-import re
+import threading
 from pathlib import Path
 
-def create_spec_file():
-    """Generate the wild.spec file using PyInstaller if it doesn't exist"""
-    spec_file = "wild.spec"
-
-    if os.path.exists(spec_file):
-        print("✅ Spec file already exists")
-        return True
-
-    print("📝 Generating wild.spec file using PyInstaller...")
-
-    # Generate spec file using PyInstaller
-    result = subprocess.run([
-        sys.executable, "-m", "PyInstaller",
-        "--name", "wild",
-        "--onefile",
-        "--console",
-        "--specpath", ".",
-        "--distpath", "dist",
-        "--workpath", "build",
-        "--clean",
-        "--noconfirm",
-        "diffgraph/cli.py"
-    ], capture_output=True, text=True)
-
-    if result.returncode != 0:
-        print(f"❌ Failed to generate spec file: {result.stderr}")
-        return False
-
-    print("✅ Generated wild.spec file")
-    return True
-
-def ensure_env_in_spec():
-    """Ensure .env file is included in the spec file if it exists"""
-    spec_file = "wild.spec"
-
-    # Check if .env file exists
-    env_file_exists = os.path.exists(".env")
-
-    if not env_file_exists:
-        print("⚠️  .env file not found - skipping")
-        return True
-
-    # Read the spec file
-    with open(spec_file, 'r') as f:
-        content = f.read()
-
-    # Check if .env is already in datas
-    if "('.env', '.')" in content:
-        print("✅ .env file already included in spec file")
-        return True
-
-    print("📝 Adding .env file to spec file...")
-
-    # Find the datas line and add .env
-    # Handle both empty datas array and non-empty datas array
-    if "datas=[]," in content:
-        # Empty datas array
-        content = content.replace("datas=[],", "datas=[('.env', '.')],")
-    elif "datas=[" in content:
-        # Non-empty datas array - add to existing items
-        content = re.sub(
-            r'datas=\[([^\]]*)\],',
-            r'datas=[\1, (\'.env\', \'.\')],',
-            content
-        )
-    else:
-        print("⚠️  Could not find datas array in spec file")
-        return False
-
-    with open(spec_file, 'w') as f:
-        f.write(content)
-    print("✅ Added .env file to spec file")
-    return True
+def get_binary_path():
+    """Get the path of the built binary for the current build mode"""
+    binary_name = "wild.exe" if sys.platform == 'win32' else "wild"
+    if os.environ.get("DIFFGRAPH_DEV"):
+        # One-folder dev build (see wild.spec)
+        return os.path.join("dist", "wild", binary_name)
+    return os.path.join("dist", binary_name)
 
 def verify_env_in_bundle():
     """Verify that the .env file is properly included in the built binary"""
     print("🔍 Verifying .env file in bundle...")
 
     # Check if binary exists
-    binary_name = "wild.exe" if sys.platform == 'win32' else "wild"
-    binary_path = os.path.join("dist", binary_name)
+    binary_path = get_binary_path()
 
     if not os.path.exists(binary_path):
         print("❌ Binary not found - cannot verify bundle")
@@ -104,29 +41,63 @@ def verify_env_in_bundle():
         print("⚠️  .env file not found in project directory")
         return False
 
+def fast_clean(path):
+    """Move a directory out of the way and delete it in a background thread.
+
+    The rename is a single syscall, so the build can start immediately while
+    the (possibly slow, e.g. antivirus-scanned) deletion happens alongside it.
+    """
+    trash = f"{path}.old.{os.getpid()}"
+    os.rename(path, trash)
+    delete_in_background(trash)
+
+def delete_in_background(path):
+    """Delete a directory tree in a background thread, ignoring errors"""
+    # Not a daemon thread, so the interpreter waits for the deletion at exit
+    threading.Thread(target=shutil.rmtree, args=(path,), kwargs={"ignore_errors": True}).start()
+
+def sweep_stale_trash():
+    """Delete trash directories left behind by earlier builds whose deletion did not finish"""
+    for trash in glob.glob("dist.old.*") + glob.glob("build.old.*"):
+        if os.path.isdir(trash):
+            delete_in_background(trash)
+
+def parse_args():
+    """Parse build script command line arguments"""
+    parser = argparse.ArgumentParser(description="Build the DiffGraph CLI binary")
+    parser.add_argument(
+        "--fresh",
+        "--no-cache",
+        dest="fresh",
+        action="store_true",
+        help="Discard PyInstaller's analysis cache and rebuild from scratch (use for release builds)",
+    )
+    return parser.parse_args()
+
 def main():
     """Build the DiffGraph CLI binary using PyInstaller"""
+    args = parse_args()
+    fresh = args.fresh or bool(os.environ.get("DIFFGRAPH_FRESH_BUILD"))
 
-    # Check if PyInstaller is installed
-    try:
-        import PyInstaller
-    except ImportError:
+    # Check if PyInstaller is installed without importing it
+    if importlib.util.find_spec("PyInstaller") is None:
         print("❌ PyInstaller not found. Installing...")
         subprocess.run([sys.executable, "-m", "pip", "install", "pyinstaller"], check=True)
 
-    # Create spec file if it doesn't exist
-    create_spec_file()
-
-    # Ensure .env file is included in spec
-    ensure_env_in_spec()
+    if os.path.exists(".env"):
+        print("✅ .env file will be bundled (see datas in wild.spec)")
+    else:
+        print("⚠️  .env file not found - skipping")
 
-    # Clean previous builds
+    # Clean previous builds. The build/ directory is PyInstaller's work cache,
+    # so it is only removed for fresh builds.
     print("🧹 Cleaning previous builds...")
-    for path in ["build", "dist"]:
+    sweep_stale_trash()
+    clean_paths = ["build", "dist"] if fresh else ["dist"]
+    for path in clean_paths:
         if os.path.exists(path):
-            import shutil
             try:
-                shutil.rmtree(path)
+                fast_clean(path)
             except PermissionError:
                 print(f"⚠️  Could not remove {path} - permission denied. Continuing...")
             except Exception as e:
@@ -134,16 +105,19 @@ def main():
 
     # Build using the spec file
     print("🔨 Building DiffGraph CLI...")
-    result = subprocess.run([
-        sys.executable, "-m", "PyInstaller", "wild.spec", "--clean"
-    ], check=True)
+    cmd = [sys.executable, "-m", "PyInstaller", "wild.spec", "--noconfirm"]
+    if fresh:
+        cmd.append("--clean")
+    upx_path = shutil.which("upx")
+    if upx_path:
+        cmd += ["--upx-dir", os.path.dirname(upx_path)]
+    else:
+        print("⚠️  UPX not found - binary will not be compressed")
+    result = subprocess.run(cmd, check=True)
 
     if result.returncode == 0:
         print("✅ Build completed successfully!")
-        if sys.platform == 'win32':
-            print(f"📦 Binary location: {os.path.join('dist', 'wild.exe')}")
-        else:
-            print(f"📦 Binary location: {os.path.join('dist', 'wild')}")
+        print(f"📦 Binary location: {get_binary_path()}")
 
         # Verify that .env file is properly included
         verify_env_in_bundle()
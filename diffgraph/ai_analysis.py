@@ -1,23 +1,22 @@
-from typing import List, Dict, Optional, Tuple
-from agents import Agent, Runner
+from typing import List, Dict, Optional, Set, Tuple
 import os
+from dataclasses import dataclass
+from collections import defaultdict
+from hashlib import blake2b
 from pydantic import BaseModel
 from .graph_manager import GraphManager, FileStatus, ChangeType, ComponentNode
+from .cache import AnalysisCache
+from .rate_limiter import RateLimiter
+import asyncio
+import functools
+import inspect
 import time
 import random
-import openai
-import re
-import networkx as nx
 from enum import Enum
 
-class FileChange(BaseModel):
-    """Model representing a file change."""
-    path: str
-    status: str
-    content: str
-
-class DiffAnalysis(BaseModel):
-    """Model representing the analysis of code changes."""
+@dataclass(frozen=True)
+class DiffAnalysis:
+    """Result of analyzing code changes."""
     summary: str
     mermaid_diagram: str
 
@@ -34,112 +33,232 @@ class ComponentAnalysis(BaseModel):
 
 class CodeChangeAnalysis(BaseModel):
     """Model representing the analysis of code changes from the LLM."""
+    path: str  # path of the analyzed file, as given in its FILE header
     summary: str
     components: List[ComponentAnalysis]
     impact: str
 
+class BatchCodeChangeAnalysis(BaseModel):
+    """Model representing the analysis of a batch of files from the LLM."""
+    files: List[CodeChangeAnalysis]
+
+# Git file status -> ChangeType; any other status counts as modified
+STATUS_TO_CHANGE_TYPE = {
+    "untracked": ChangeType.ADDED,
+    "added": ChangeType.ADDED,
+    "deleted": ChangeType.DELETED,
+}
+
+# Component change type reported by the LLM -> ChangeType
+COMPONENT_CHANGE_TYPES = {change_type.value: change_type for change_type in ChangeType}
+
 class DependencyMode(Enum):
     """Mode for processing dependency relationships."""
     DEPENDENCY = "dependency"  # Process components that this component depends on
     DEPENDENT = "dependent"    # Process components that depend on this component
 
+ANALYSIS_INSTRUCTIONS = """You are an expert code analyzer. Your task is to:
+1. Analyze the given code changes
+2. For each component that was changed, identify:
+   - Its name
+   - Its type (container/function/method)
+   - How it was changed (added, deleted, or modified)
+   - Its parent component (if it's nested within another component)
+   - Its dependencies (what it uses)
+   - Its dependents (what uses it)
+   - Any nested components within it (if it's a container)
+
+Important guidelines:
+- A 'container' is any component that can contain other components (classes, interfaces, traits, modules, namespaces)
+- A 'function' is any standalone function or procedure
+- A 'method' is any function that belongs to a container
+- Always include both container-level and nested component changes
+- For nested components, specify their parent container
+- For containers, list any nested components that were changed
+- Dependencies can be to both container-level and nested components
+- If a method/function is changed, it should be listed as a separate component with its parent specified
+
+3. Generate a clear summary of the changes
+
+You may be given several files at once. Each file starts with a "### FILE: <path>" header.
+Analyze every file separately and return one entry per file in `files`, with `path` set
+to the exact path from its header.
+
+Note: For each component, you must specify:
+- component_type: what kind of component it is (container/function/method)
+- change_type: how it was changed (added, deleted, modified)
+- parent: the name of its parent component if it's nested (e.g., a method within a class)
+- nested_components: list of any components nested within this one (if it's a container)"""
+
+# Model used for the analysis
+ANALYSIS_MODEL = "gpt-4o"
+
+# Bump when the prompt or output models change in a way the instructions
+# do not show, so cached analyses from older versions are not reused
+PROMPT_VERSION = "1"
+
+# Cached analyses are only valid for the model and prompt that produced them
+CACHE_NAMESPACE = blake2b(
+    f"{ANALYSIS_MODEL}|{PROMPT_VERSION}|{ANALYSIS_INSTRUCTIONS}".encode("utf-8")
+).hexdigest()
+
+# Maximum number of agent requests in flight at once
+MAX_CONCURRENT_REQUESTS = 8
+
+# Approximate token budget for the file contents sent in a single request
+MAX_BATCH_TOKENS = 8000
+
+# Tokens reserved with the rate limiter for each response
+COMPLETION_TOKEN_BUDGET = 4096
+
+_token_encoder = None
+
+def estimate_tokens(text: str) -> int:
+    """
+    Estimate the number of tokens ANALYSIS_MODEL needs for text.
+
+    Uses tiktoken when it is installed and its encoding can be loaded, and falls
+    back to one token per four characters otherwise.
+
+    Args:
+        text: The text to measure
+
+    Returns:
+        Estimated token count
+    """
+    global _token_encoder
+    if _token_encoder is None:
+        try:
+            import tiktoken
+            _token_encoder = tiktoken.encoding_for_model(ANALYSIS_MODEL)
+        except Exception:
+            # Not installed, unknown model, or the encoding file could not be
+            # downloaded (e.g. offline); an estimate is not worth failing over
+            _token_encoder = False
+    if _token_encoder:
+        return len(_token_encoder.encode(text, disallowed_special=()))
+    return len(text) // 4
+
+def _normalize_analysis_path(path: str) -> str:
+    """Normalize a file path for matching analyses: forward slashes, no leading "./", case-insensitive."""
+    path = os.path.normpath(path.strip().replace("\\", "/")).replace("\\", "/")
+    while path.startswith("./"):
+        path = path[2:]
+    return path.lower()
+
+def _analysis_file_name(path: str) -> str:
+    """Get the normalized final component of a file path for matching analyses."""
+    return _normalize_analysis_path(path).rsplit("/", 1)[-1]
+
+MAX_RETRIES = 5
+BASE_RETRY_DELAY = 1  # Start with 1 second
+MAX_RETRY_DELAY = 60  # Maximum delay of 60 seconds
+
+def _retry_delay(error: Exception, attempt: int) -> float:
+    """Get the delay before retrying after a rate limit error."""
+    # Use the retry delay from the error response when it provides one
+    retry_after = getattr(error, 'retry_after', None)
+    if isinstance(retry_after, (int, float)) and retry_after > 0:
+        return float(retry_after)
+    # Fallback to exponential backoff if retry_after is not available
+    return min(BASE_RETRY_DELAY * (2 ** attempt) + random.uniform(0, 1), MAX_RETRY_DELAY)
+
 def exponential_backoff_retry(func):
-    """Decorator to implement exponential backoff retry logic using API rate limit information."""
+    """
+    Decorator to implement exponential backoff retry logic using API rate limit information.
+
+    Works on both plain functions and coroutine functions; coroutines wait with
+    asyncio.sleep so other requests keep running during the backoff.
+    """
+    if inspect.iscoroutinefunction(func):
+        @functools.wraps(func)
+        async def async_wrapper(*args, **kwargs):
+            import openai
+
+            for attempt in range(MAX_RETRIES):
+                try:
+                    return await func(*args, **kwargs)
+                except openai.RateLimitError as e:
+                    if attempt == MAX_RETRIES - 1:  # Last attempt
+                        raise  # Re-raise the exception if all retries failed
+                    delay = _retry_delay(e, attempt)
+                    print(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
+                    await asyncio.sleep(delay)
+        return async_wrapper
+
+    @functools.wraps(func)
     def wrapper(*args, **kwargs):
-        max_retries = 5
-        base_delay = 1  # Start with 1 second
-        max_delay = 60  # Maximum delay of 60 seconds
+        import openai
 
-        for attempt in range(max_retries):
+        for attempt in range(MAX_RETRIES):
             try:
                 return func(*args, **kwargs)
             except openai.RateLimitError as e:
-                if attempt == max_retries - 1:  # Last attempt
+                if attempt == MAX_RETRIES - 1:  # Last attempt
                     raise  # Re-raise the exception if all retries failed
-
-                # Try to get the retry delay from the error response
-                try:
-                    # The error response usually contains a 'retry_after' field
-                    retry_after = getattr(e, 'retry_after', None)
-                    if retry_after:
-                        delay = float(retry_after)
-                    else:
-                        # Fallback to exponential backoff if retry_after is not available
-                        delay = min(base_delay * (2 ** attempt) + random.uniform(0, 1), max_delay)
-                except (ValueError, TypeError):
-                    # If we can't parse the retry_after, fallback to exponential backoff
-                    delay = min(base_delay * (2 ** attempt) + random.uniform(0, 1), max_delay)
-
+                delay = _retry_delay(e, attempt)
                 print(f"Rate limit hit. Retrying in {delay:.2f} seconds...")
                 time.sleep(delay)
-            except Exception as e:
-                raise  # Re-raise other exceptions immediately
     return wrapper
 
 class CodeAnalysisAgent:
     """Agent for analyzing code changes using OpenAI's Agents SDK."""
 
-    def __init__(self, api_key: Optional[str] = None):
-        """Initialize the agent with OpenAI API key."""
+    def __init__(self, api_key: Optional[str] = None, use_cache: bool = True, verbose: bool = False):
+        """Initialize the agent with OpenAI API key.
+
+        Args:
+            api_key: OpenAI API key, defaults to the OPENAI_API_KEY environment variable
+            use_cache: Whether to reuse analysis results cached by previous runs
+            verbose: Whether to print the generated diagram, per-file summaries and unresolved dependencies
+        """
         self.api_key = api_key or os.getenv("OPENAI_API_KEY")
         if not self.api_key:
             raise ValueError("OpenAI API key is required. Set OPENAI_API_KEY environment variable.")
 
+        # The agents SDK and OpenAI client pull in a large import tree, so
+        # they are only imported once an analysis is actually requested
+        import openai
+        from agents import Agent, OpenAIResponsesModel
+
+        # Every API response reports the remaining rate limit budget, which
+        # the limiter uses to hold back requests that would be rejected
+        self.rate_limiter = RateLimiter()
+        client = openai.AsyncOpenAI(
+            api_key=self.api_key,
+            http_client=openai.DefaultAsyncHttpxClient(
+                event_hooks={"response": [self.rate_limiter.record_response]}
+            ),
+        )
+
         # Initialize the agent with specific instructions for code analysis
         self.agent = Agent(
             name="Code Analysis Agent",
-            instructions="""You are an expert code analyzer. Your task is to:
-            1. Analyze the given code changes
-            2. For each component that was changed, identify:
-               - Its name
-               - Its type (container/function/method)
-               - How it was changed (added, deleted, or modified)
-               - Its parent component (if it's nested within another component)
-               - Its dependencies (what it uses)
-               - Its dependents (what uses it)
-               - Any nested components within it (if it's a container)
-
-            Important guidelines:
-            - A 'container' is any component that can contain other components (classes, interfaces, traits, modules, namespaces)
-            - A 'function' is any standalone function or procedure
-            - A 'method' is any function that belongs to a container
-            - Always include both container-level and nested component changes
-            - For nested components, specify their parent container
-            - For containers, list any nested components that were changed
-            - Dependencies can be to both container-level and nested components
-            - If a method/function is changed, it should be listed as a separate component with its parent specified
-
-            3. Generate a clear summary of the changes
-
-            Note: For each component, you must specify:
-            - component_type: what kind of component it is (container/function/method)
-            - change_type: how it was changed (added, deleted, modified)
-            - parent: the name of its parent component if it's nested (e.g., a method within a class)
-            - nested_components: list of any components nested within this one (if it's a container)""",
-            model="gpt-4o",
-            output_type=CodeChangeAnalysis
+            instructions=ANALYSIS_INSTRUCTIONS,
+            model=OpenAIResponsesModel(model=ANALYSIS_MODEL, openai_client=client),
+            output_type=BatchCodeChangeAnalysis
         )
 
         self.graph_manager = GraphManager()
+        self.cache = AnalysisCache() if use_cache else None
+        self.verbose = verbose
 
     def _determine_change_type(self, status: str) -> ChangeType:
         """Convert git status to ChangeType."""
-        if status == "untracked":
-            return ChangeType.ADDED
-        elif status == "deleted":
-            return ChangeType.DELETED
-        else:
-            return ChangeType.MODIFIED
+        return STATUS_TO_CHANGE_TYPE.get(status, ChangeType.MODIFIED)
 
     @exponential_backoff_retry
-    def _run_agent_analysis(self, prompt: str) -> str:
+    async def _run_agent_analysis(self, prompt: str) -> BatchCodeChangeAnalysis:
         """Run the agent analysis with retry logic."""
-        result = Runner.run_sync(self.agent, prompt)
-        return result.final_output
+        from agents import Runner
+
+        await self.rate_limiter.acquire(estimate_tokens(prompt) + COMPLETION_TOKEN_BUDGET)
+        result = await Runner.run(self.agent, prompt)
+        return result.final_output_as(BatchCodeChangeAnalysis, raise_if_incorrect_type=True)
 
     def analyze_changes(self, files_with_content: List[Dict[str, str]], progress_callback=None) -> DiffAnalysis:
         """
-        Analyze code changes using the OpenAI agent, processing files incrementally.
+        Analyze code changes using the OpenAI agent, processing files concurrently.
 
         Args:
             files_with_content: List of dictionaries containing file changes
@@ -149,150 +268,367 @@ class CodeAnalysisAgent:
         Returns:
             DiffAnalysis object containing summary and mermaid diagram
         """
+        try:
+            return asyncio.run(self._analyze_changes_async(files_with_content, progress_callback))
+        finally:
+            if self.cache is not None:
+                self.cache.close()
+
+    async def _analyze_changes_async(self, files_with_content: List[Dict[str, str]], progress_callback=None) -> DiffAnalysis:
+        """Async implementation of analyze_changes."""
         total_files = len(files_with_content)
-        processed_files = 0
 
         # Initialize the graph with all files
         for file_info in files_with_content:
             change_type = self._determine_change_type(file_info['status'])
             self.graph_manager.add_file(file_info['path'], change_type)
 
-        # Process files in BFS order
+        files_by_path = {f['path']: f for f in files_with_content}
+
+        # Process files in BFS order. Each wave drains the queue, packs small
+        # files into shared requests and analyzes the batches concurrently;
+        # the semaphore caps requests in flight.
+        semaphore = asyncio.Semaphore(MAX_CONCURRENT_REQUESTS)
         while True:
-            current_file = self.graph_manager.get_next_file()
-            if not current_file:
+            wave = self.graph_manager.get_next_files()
+            if not wave:
                 break
 
-            try:
-                # Mark file as processing
+            # Deleted files need no component breakdown, and files analyzed
+            # by a previous run go straight into the graph
+            uncached = []
+            for current_file in wave:
+                file_info = files_by_path.get(current_file)
+                if file_info and self._determine_change_type(file_info['status']) is ChangeType.DELETED:
+                    self.graph_manager.mark_processing(current_file)
+                    if progress_callback:
+                        progress_callback(current_file, total_files, "processing")
+                    self.graph_manager.mark_processed(current_file, f"File {current_file} deleted", [])
+                    if progress_callback:
+                        progress_callback(current_file, total_files, "completed")
+                    continue
+
+                cached_analysis = self._get_cached_analysis(file_info)
+                if cached_analysis is None:
+                    uncached.append(current_file)
+                    continue
                 self.graph_manager.mark_processing(current_file)
                 if progress_callback:
                     progress_callback(current_file, total_files, "processing")
+                self._apply_file_analysis(current_file, cached_analysis, total_files, progress_callback)
 
-                # Find the file content
-                file_content = next(
-                    (f['content'] for f in files_with_content if f['path'] == current_file),
-                    None
-                )
-
-                if not file_content:
-                    raise ValueError(f"Content not found for file: {current_file}")
-
-                # Prepare the prompt for the agent
-                prompt = f"Analyze the following code changes in {current_file}:\n\n"
-                prompt += f"```\n{file_content}\n```\n\n"
-
-                # Add context about already processed components
-                processed_components = [
-                    comp for comp in self.graph_manager.component_nodes.values()
-                    if comp.file_path == current_file
-                ]
-                if processed_components:
-                    prompt += "Already identified components in this file:\n"
-                    for comp in processed_components:
-                        prompt += f"- {comp.name}: {comp.summary}\n"
-
-                # Run the agent with retry logic
-                if progress_callback:
-                    progress_callback(current_file, total_files, "analyzing")
-                response_data = self._run_agent_analysis(prompt)
-                summary = response_data.summary
-                components = response_data.components
-
-                # Add components to the graph
-                if progress_callback:
-                    progress_callback(current_file, total_files, "processing_components")
-                for comp in components:
-                    try:
-                        change_type = ChangeType[comp.change_type.upper()]
-                        self.graph_manager.add_component(
-                            comp.name,
-                            current_file,
-                            change_type,
-                            component_type=comp.component_type,
-                            parent=comp.parent,
-                            summary=comp.summary,
-                            dependencies=comp.dependencies,
-                            dependents=comp.dependents
-                        )
-
-                        # Process dependencies and dependents
-                        self._process_dependencies(comp, current_file, DependencyMode.DEPENDENCY)  # Process dependencies
-                        self._process_dependencies(comp, current_file, DependencyMode.DEPENDENT)   # Process dependents
-
-                    except Exception as e:
-                        print(f"Error processing component {comp.name}: {str(e)}")
-                        continue
-
-                # Mark file as processed
-                self.graph_manager.mark_processed(current_file, summary, components)
-                processed_files += 1
-                if progress_callback:
-                    progress_callback(current_file, total_files, "completed")
-
-            except Exception as e:
-                self.graph_manager.mark_error(current_file, str(e))
-                if progress_callback:
-                    progress_callback(current_file, total_files, "error")
-                processed_files += 1
+            await asyncio.gather(*(
+                self._analyze_batch(batch, files_by_path, total_files, semaphore, progress_callback)
+                for batch in self._group_into_batches(uncached, files_by_path)
+            ))
 
         # Generate the final Mermaid diagram
         if progress_callback:
             progress_callback(None, total_files, "generating_diagram")
         try:
             mermaid_diagram = self.graph_manager.get_mermaid_diagram()
-            print(f"Mermaid diagram generated successfully: {mermaid_diagram}")
+            if self.verbose:
+                print(f"Mermaid diagram generated successfully: {mermaid_diagram}")
         except Exception as e:
             print(f"Error generating Mermaid diagram: {str(e)}")
             mermaid_diagram = "Error generating diagram"
 
         # Generate overall summary
-        overall_summary = "Analysis Summary:\n\n"
+        summary_lines = ["Analysis Summary:", ""]
+        processed, error = FileStatus.PROCESSED, FileStatus.ERROR
         for file_path, node in self.graph_manager.file_nodes.items():
-            if node.status == FileStatus.PROCESSED:
-                overall_summary += f"- {file_path}: {node.summary}\n"
-                print(f"Processed file: {file_path}, Summary: {node.summary}")
-            elif node.status == FileStatus.ERROR:
-                overall_summary += f"- {file_path}: Error - {node.error}\n"
+            if node.status is processed:
+                summary_lines.append(f"- {file_path}: {node.summary}")
+                if self.verbose:
+                    print(f"Processed file: {file_path}, Summary: {node.summary}")
+            elif node.status is error:
+                summary_lines.append(f"- {file_path}: Error - {node.error}")
+        summary_lines.append("")
+        overall_summary = "\n".join(summary_lines)
 
         return DiffAnalysis(
             summary=overall_summary,
             mermaid_diagram=mermaid_diagram
         )
 
-    def _would_create_cycle(self, source: str, target: str) -> bool:
-        """Check if adding an edge would create a cycle in the component graph."""
-        # Create a temporary copy of the graph
-        temp_graph = self.graph_manager.component_graph.copy()
+    def _get_cached_analysis(self, file_info: Optional[Dict[str, str]]) -> Optional[CodeChangeAnalysis]:
+        """Return the cached analysis for a file change, if there is one."""
+        if self.cache is None or not file_info:
+            return None
+        cached = self.cache.get(AnalysisCache.make_key(
+            file_info['path'], file_info['status'], file_info['content'], CACHE_NAMESPACE
+        ))
+        if cached is None:
+            return None
+        try:
+            # Validate straight from the raw JSON; pydantic's parser avoids building an intermediate dict
+            return CodeChangeAnalysis.model_validate_json(cached)
+        except ValueError:
+            return None
+
+    def _put_cached_analysis(self, file_info: Dict[str, str], analysis: CodeChangeAnalysis) -> None:
+        """Cache the analysis of a file change for future runs."""
+        if self.cache is None:
+            return
+        key = AnalysisCache.make_key(file_info['path'], file_info['status'], file_info['content'], CACHE_NAMESPACE)
+        self.cache.put(key, analysis.model_dump_json().encode("utf-8"))
+
+    def _group_into_batches(self, file_paths: List[str], files_by_path: Dict[str, Dict[str, str]]) -> List[List[str]]:
+        """
+        Greedily group files into batches that fit within MAX_BATCH_TOKENS.
+
+        Token counts come from estimate_tokens(). A file larger than the
+        budget gets a batch of its own.
+
+        Args:
+            file_paths: Paths of the files to group, in processing order
+            files_by_path: Mapping of file path to its file change dictionary
+
+        Returns:
+            List of batches, each a list of file paths
+        """
+        batches = []
+        current_batch = []
+        current_tokens = 0
+        for file_path in file_paths:
+            file_info = files_by_path.get(file_path)
+            tokens = estimate_tokens(file_info['content']) if file_info else 0
+            if current_batch and current_tokens + tokens > MAX_BATCH_TOKENS:
+                batches.append(current_batch)
+                current_batch = []
+                current_tokens = 0
+            current_batch.append(file_path)
+            current_tokens += tokens
+        if current_batch:
+            batches.append(current_batch)
+        return batches
+
+    async def _analyze_batch(self, batch: List[str], files_by_path: Dict[str, Dict[str, str]], total_files: int,
+                             semaphore: asyncio.Semaphore, progress_callback=None) -> None:
+        """
+        Analyze a batch of files with a single agent request and add their components to the graph.
+
+        Graph updates run on the event loop between awaits, so they never interleave
+        with updates from other batches.
 
-        # Add the potential edge
-        temp_graph.add_edge(source, target)
+        Args:
+            batch: Paths of the files to analyze together
+            files_by_path: Mapping of file path to its file change dictionary
+            total_files: Total number of files being analyzed
+            semaphore: Semaphore limiting the number of concurrent agent requests
+            progress_callback: Optional callback function to report progress
+        """
+        async with semaphore:
+            pending = []
+            for current_file in batch:
+                # Mark file as processing
+                self.graph_manager.mark_processing(current_file)
+                if progress_callback:
+                    progress_callback(current_file, total_files, "processing")
+
+                # Find the file content
+                file_info = files_by_path.get(current_file)
+                file_content = file_info['content'] if file_info else None
+
+                if not file_content:
+                    self.graph_manager.mark_error(current_file, f"Content not found for file: {current_file}")
+                    if progress_callback:
+                        progress_callback(current_file, total_files, "error")
+                    continue
+                pending.append((current_file, file_content))
+
+            if not pending:
+                return
+
+            # Prepare the prompt for the agent
+            parts = ["Analyze the following code changes:\n\n"]
+            for current_file, file_content in pending:
+                parts.extend((f"### FILE: {current_file}\n```\n", file_content, "\n```\n\n"))
 
-        # Check for cycles
+                # Add context about already processed components
+                processed_components = self.graph_manager.get_file_components(current_file)
+                if processed_components:
+                    parts.append("Already identified components in this file:\n")
+                    parts.extend(f"- {comp.name}: {comp.summary}\n" for comp in processed_components)
+                    parts.append("\n")
+            prompt = "".join(parts)
+
+            try:
+                # Run the agent with retry logic
+                if progress_callback:
+                    for current_file, _ in pending:
+                        progress_callback(current_file, total_files, "analyzing")
+                response_data = await self._run_agent_analysis(prompt)
+            except Exception as e:
+                for current_file, _ in pending:
+                    self.graph_manager.mark_error(current_file, str(e))
+                    if progress_callback:
+                        progress_callback(current_file, total_files, "error")
+                return
+
+            analyses, position_matched = self._match_batch_analyses(
+                [current_file for current_file, _ in pending], response_data.files
+            )
+            for current_file, _ in pending:
+                analysis = analyses.get(current_file)
+                if analysis is None:
+                    self.graph_manager.mark_error(current_file, "No analysis returned for file")
+                    if progress_callback:
+                        progress_callback(current_file, total_files, "error")
+                    continue
+                self._apply_file_analysis(current_file, analysis, total_files, progress_callback)
+                # A pairing guessed from position alone must not outlive this run
+                if current_file not in position_matched:
+                    self._put_cached_analysis(files_by_path[current_file], analysis)
+
+    def _match_batch_analyses(self, file_paths: List[str], results: List[CodeChangeAnalysis]
+                              ) -> Tuple[Dict[str, CodeChangeAnalysis], Set[str]]:
+        """
+        Match the analyses returned for a batch to the files that were sent.
+
+        The model echoes each file's path back, but not always verbatim, so paths
+        are matched exactly, then after normalization, then by unambiguous file
+        name, and finally by position when the number of analyses equals the
+        number of files.
+
+        Args:
+            file_paths: Paths of the files in the batch, in prompt order
+            results: Analyses returned by the agent, in response order
+
+        Returns:
+            Mapping of file path to its analysis, for the files that could be
+            matched, and the paths that were only matched by position
+        """
+        # A single file needs no matching, whatever path came back with it
+        if len(file_paths) == 1 and len(results) == 1:
+            return {file_paths[0]: results[0]}, set()
+
+        exact = {result.path: result for result in results}
+        normalized = {_normalize_analysis_path(result.path): result for result in results}
+        matched = {}
+        used = set()
+        for file_path in file_paths:
+            result = exact.get(file_path) or normalized.get(_normalize_analysis_path(file_path))
+            if result is not None and id(result) not in used:
+                matched[file_path] = result
+                used.add(id(result))
+
+        # Match by file name when exactly one remaining file and one unclaimed
+        # analysis share it, e.g. "src/a.py" reported back as "a.py"
+        files_by_name = defaultdict(list)
+        for file_path in file_paths:
+            if file_path not in matched:
+                files_by_name[_analysis_file_name(file_path)].append(file_path)
+        results_by_name = defaultdict(list)
+        for result in results:
+            if id(result) not in used:
+                results_by_name[_analysis_file_name(result.path)].append(result)
+        for name, paths in files_by_name.items():
+            candidates = results_by_name.get(name, [])
+            if len(paths) == 1 and len(candidates) == 1:
+                matched[paths[0]] = candidates[0]
+                used.add(id(candidates[0]))
+
+        # Pair the remaining files with unclaimed analyses in the same position
+        position_matched = set()
+        if len(matched) < len(file_paths) and len(results) == len(file_paths):
+            for file_path, result in zip(file_paths, results):
+                if file_path not in matched and id(result) not in used:
+                    matched[file_path] = result
+                    used.add(id(result))
+                    position_matched.add(file_path)
+        return matched, position_matched
+
+    def _apply_file_analysis(self, current_file: str, analysis: CodeChangeAnalysis, total_files: int,
+                             progress_callback=None) -> None:
+        """
+        Add the components of an analyzed file to the graph and mark the file as processed.
+
+        Args:
+            current_file: Path of the analyzed file
+            analysis: The agent's analysis of the file
+            total_files: Total number of files being analyzed
+            progress_callback: Optional callback function to report progress
+        """
         try:
-            nx.find_cycle(temp_graph)
-            return True
-        except nx.NetworkXNoCycle:
-            return False
+            summary = analysis.summary
+            components = analysis.components
 
-    def _find_component_match(self, dep: str, other_comp: ComponentNode, comp: ComponentNode) -> bool:
+            # Add components to the graph
+            if progress_callback:
+                progress_callback(current_file, total_files, "processing_components")
+            for comp in components:
+                try:
+                    change_type = COMPONENT_CHANGE_TYPES.get(comp.change_type.lower(), ChangeType.MODIFIED)
+                    self.graph_manager.add_component(
+                        comp.name,
+                        current_file,
+                        change_type,
+                        component_type=comp.component_type,
+                        parent=comp.parent,
+                        summary=comp.summary
+                    )
+
+                    # Process dependencies and dependents
+                    self._process_dependencies(comp, current_file)
+
+                except Exception as e:
+                    print(f"Error processing component {comp.name}: {str(e)}")
+                    continue
+
+            # Mark file as processed
+            self.graph_manager.mark_processed(current_file, summary, components)
+            if progress_callback:
+                progress_callback(current_file, total_files, "completed")
+
+        except Exception as e:
+            self.graph_manager.mark_error(current_file, str(e))
+            if progress_callback:
+                progress_callback(current_file, total_files, "error")
+
+    def _would_create_cycle(self, source: str, target: str) -> bool:
+        """Check if adding an edge would create a cycle in the component graph."""
+        # The new edge closes a cycle exactly when target already reaches source
+        return self.graph_manager.has_path(target, source)
+
+    def _find_component_matches(self, dep: str) -> List[ComponentNode]:
         """
-        Check if a dependency matches a component using precise matching rules.
+        Find the components a dependency name refers to.
+
+        A dependency matches a component either by its name or by a qualified
+        "file_path::name" reference. Names are compared case-insensitively.
 
         Args:
             dep: The dependency to match
-            other_comp: The component to match against
-            comp: The source component (for parent context)
 
         Returns:
-            bool: True if there's a match, False otherwise
+            List of matching components, in the order they were added
+        """
+        if "::" in dep:
+            # A qualified reference only ever matches components in that file
+            file_path, _, name = dep.partition("::")
+            return self._find_components_by_name(name, file_path)
+        return self._find_components_by_name(dep)
+
+    def _find_components_by_name(self, name: str, file_path: Optional[str] = None) -> List[ComponentNode]:
+        """
+        Look up components by name, falling back to the last segment of a dotted name (e.g. Class.method).
+
+        Args:
+            name: The component name to look up
+            file_path: If given, only components in this file match
+
+        Returns:
+            List of matching components, in the order they were added
         """
-        return (dep == other_comp.name or
-                (dep.startswith(f"{other_comp.file_path}::") and
-                 dep.endswith(other_comp.name)) or
-                (comp.parent and other_comp.parent and
-                 comp.parent == other_comp.parent and
-                 dep == other_comp.name))
+        matches = self.graph_manager.get_components_by_name(name)
+        if file_path is not None:
+            matches = [c for c in matches if c.file_path == file_path]
+        if not matches and "." in name:
+            matches = self.graph_manager.get_components_by_name(name.rsplit(".", 1)[1])
+            if file_path is not None:
+                matches = [c for c in matches if c.file_path == file_path]
+        return matches
 
     def _add_dependency_relationship(self, source_path: str, target_path: str) -> bool:
         """
@@ -310,35 +646,38 @@ class CodeAnalysisAgent:
             return True
         return False
 
-    def _process_dependencies(self, comp: ComponentNode, current_file: str, mode: DependencyMode) -> None:
+    def _process_dependencies(self, comp: ComponentNode, current_file: str) -> None:
         """
-        Process dependency relationships for a component.
+        Process the dependency and dependent relationships of a component in a single pass.
 
         Args:
             comp: The component to process
             current_file: The current file being processed
-            mode: The mode of processing - either finding dependencies or dependents
         """
-        items = comp.dependents if mode == DependencyMode.DEPENDENT else comp.dependencies
-
-        for item in items:
-            if not item:  # Skip empty items
-                continue
-
-            found = False
-            for other_comp in self.graph_manager.component_nodes.values():
-                if self._find_component_match(item, other_comp, comp):
-                    # Set source and target paths based on the processing mode
-                    if mode == DependencyMode.DEPENDENT:
-                        source_path = f"{other_comp.file_path}::{other_comp.name}"
-                        target_path = f"{current_file}::{comp.name}"
-                    else:
-                        source_path = f"{current_file}::{comp.name}"
-                        target_path = f"{other_comp.file_path}::{other_comp.name}"
+        component_id = f"{current_file}::{comp.name}"
+        relationships = (
+            (DependencyMode.DEPENDENCY, comp.dependencies),
+            (DependencyMode.DEPENDENT, comp.dependents),
+        )
 
-                    if self._add_dependency_relationship(source_path, target_path):
+        for mode, items in relationships:
+            is_dependent = mode is DependencyMode.DEPENDENT
+            for item in items:
+                item = item.strip()
+                if not item:  # Skip empty and whitespace-only items
+                    continue
+
+                found = False
+                for other_comp in self._find_component_matches(item):
+                    other_id = other_comp.component_id
+                    # Dependents point at this component, dependencies away from it
+                    if is_dependent:
+                        added = self._add_dependency_relationship(other_id, component_id)
+                    else:
+                        added = self._add_dependency_relationship(component_id, other_id)
+                    if added:
                         found = True
                         break
 
-            if not found:
-                print(f"Warning: Could not resolve {mode.value} '{item}' for component '{comp.name}' in {current_file}")
\ No newline at end of file
+                if not found and self.verbose:
+                    print(f"Warning: Could not resolve {mode.value} '{item}' for component '{comp.name}' in {current_file}")
@@ -0,0 +1,90 @@
+"""
+On-disk cache of per-file analysis results.
+Lets repeated runs skip the LLM for files whose changes have not changed.
+"""
+
+import os
+import sqlite3
+from hashlib import blake2b
+from pathlib import Path
+from typing import Optional
+
+
+def get_cache_directory() -> Path:
+    """Get the directory where analysis results are cached."""
+    cache_home = os.environ.get("XDG_CACHE_HOME")
+    base = Path(cache_home) if cache_home else Path.home() / ".cache"
+    return base / "diffgraph"
+
+
+class AnalysisCache:
+    """
+    Stores one JSON document per analyzed file, keyed on the file's path, status and content.
+
+    Cached results are reused unconditionally. The analysis is a deterministic
+    summary of the change rather than a sample we want variety from, so a
+    repeat request for the same input would only cost time and tokens.
+    Callers pass a namespace identifying the model and prompt that produced
+    a result, so changing either invalidates older entries.
+
+    Entries live in a single SQLite database in WAL mode, so one run can read
+    while another writes. If the database cannot be opened the cache behaves
+    as if it were empty.
+    """
+
+    DATABASE_NAME = "analysis.sqlite"
+
+    def __init__(self, cache_dir: Optional[Path] = None):
+        """Initialize the cache in the given directory (defaults to ~/.cache/diffgraph)."""
+        self.cache_dir = cache_dir or get_cache_directory()
+        self._connection: Optional[sqlite3.Connection] = None
+        self._unavailable = False
+
+    @staticmethod
+    def make_key(path: str, status: str, content: str, namespace: str = "") -> str:
+        """Build the cache key for a file change analyzed under the given namespace."""
+        return blake2b(f"{namespace}|{path}|{status}|{content}".encode("utf-8")).hexdigest()
+
+    def _connect(self) -> Optional[sqlite3.Connection]:
+        """Open the database on first use. Returns None if it is unavailable."""
+        if self._connection is None and not self._unavailable:
+            try:
+                self.cache_dir.mkdir(parents=True, exist_ok=True)
+                connection = sqlite3.connect(str(self.cache_dir / self.DATABASE_NAME))
+                connection.execute("PRAGMA journal_mode=WAL")
+                connection.execute("PRAGMA synchronous=NORMAL")
+                connection.execute(
+                    "CREATE TABLE IF NOT EXISTS analyses (key TEXT PRIMARY KEY, value BLOB NOT NULL)"
+                )
+                self._connection = connection
+            except (OSError, sqlite3.Error):
+                self._unavailable = True
+        return self._connection
+
+    def get(self, key: str) -> Optional[bytes]:
+        """Return the JSON document cached under key, or None if it is missing or unreadable."""
+        connection = self._connect()
+        if connection is None:
+            return None
+        try:
+            row = connection.execute("SELECT value FROM analyses WHERE key = ?", (key,)).fetchone()
+        except sqlite3.Error:
+            return None
+        return bytes(row[0]) if row else None
+
+    def put(self, key: str, value: bytes) -> None:
+        """Store a JSON document under key. Failures to write are ignored."""
+        connection = self._connect()
+        if connection is None:
+            return
+        try:
+            with connection:
+                connection.execute("INSERT OR REPLACE INTO analyses (key, value) VALUES (?, ?)", (key, value))
+        except sqlite3.Error:
+            pass
+
+    def close(self) -> None:
+        """Close the database connection, if one is open."""
+        if self._connection is not None:
+            self._connection.close()
+            self._connection = None
@@ -1,79 +1,174 @@
+import shutil
 import subprocess
 import sys
+from concurrent.futures import Future, ThreadPoolExecutor, as_completed
 from pathlib import Path
 import click
-from click_spinner import spinner
-from typing import List, Dict
+from typing import List, Dict, Optional
 import os
-from diffgraph.ai_analysis import CodeAnalysisAgent
-from diffgraph.html_report import generate_html_report, AnalysisResult
 from diffgraph.env_loader import load_env_file, debug_environment
-from diffgraph.utils import sanitize_diff_args, involves_working_tree
+from diffgraph.utils import sanitize_diff_args, involves_working_tree, split_diff_by_file
 
 # Load environment variables
 load_env_file()
 
+# Resolve git once instead of searching PATH on every spawn
+GIT = shutil.which("git") or "git"
+
+# Environment for the read-only git commands run during analysis. Optional
+# locks are disabled so they never rewrite the index while reading it.
+GIT_ENV = {**os.environ, "GIT_OPTIONAL_LOCKS": "0"}
+
+# git diff --name-status letter -> file status; anything else counts as modified
+DIFF_STATUS_NAMES = {
+    'A': 'added',
+    'D': 'deleted',
+}
+
+# Untracked files with these extensions are binary and never sent for analysis
+BINARY_EXTENSIONS = frozenset({
+    '.png', '.jpg', '.jpeg', '.gif', '.bmp', '.ico', '.webp', '.pdf',
+    '.zip', '.gz', '.tar', '.7z', '.jar', '.so', '.dll', '.dylib', '.exe',
+    '.bin', '.class', '.pyc', '.woff', '.woff2', '.ttf', '.otf', '.mp3', '.mp4',
+})
+
+# Untracked files are read up to this many bytes; the model could not take in more
+MAX_UNTRACKED_BYTES = 256 * 1024
+
+# Leading bytes checked for NUL to detect binary files without a known extension
+BINARY_SNIFF_BYTES = 8192
+
+# Progress message for each analysis status reported by CodeAnalysisAgent
+PROGRESS_MESSAGES = {
+    "processing": "🔄 Processing {name} ({index}/{total})...",
+    "analyzing": "🧠 Analyzing {name} with AI ({index}/{total})...",
+    "processing_components": "🔍 Processing components in {name} ({index}/{total})...",
+    "completed": "✅ Completed analysis of {name} ({index}/{total})...",
+    "error": "❌ Error analyzing {name} ({index}/{total})...",
+}
+
+# Statuses reported once a file is done, successfully or not
+FINISHED_STATUSES = frozenset({"completed", "error"})
+
+# Threads used to read untracked files; reads are I/O bound, so this can exceed the CPU count
+UNTRACKED_READ_WORKERS = min(32, (os.cpu_count() or 1) * 4)
+
 def is_git_repo() -> bool:
-    """Check if current directory is a git repository."""
+    """
+    Check if current directory is a git repository.
+
+    Looks for a .git directory, or the .git file of a linked worktree or
+    submodule, in the current directory and its parents. That avoids spawning
+    git for the common case; GIT_DIR overrides still go through git itself.
+    """
+    if 'GIT_DIR' not in os.environ:
+        cwd = Path.cwd()
+        for directory in (cwd, *cwd.parents):
+            git_path = directory / '.git'
+            if (git_path / 'HEAD').is_file():
+                return True
+            if git_path.is_file():
+                try:
+                    with open(git_path, 'r', encoding='utf-8') as f:
+                        if f.readline().startswith('gitdir:'):
+                            return True
+                except OSError:
+                    pass
+        return False
+
     try:
         subprocess.run(
-            ["git", "rev-parse", "--is-inside-work-tree"],
+            [GIT, "rev-parse", "--is-inside-work-tree"],
             check=True,
             capture_output=True,
-            text=True
+            text=True,
+            env=GIT_ENV
         )
         return True
     except subprocess.CalledProcessError:
         return False
 
+def start_git(cmd: List[str]) -> subprocess.Popen:
+    """Start a git command with its output captured as text, without waiting for it."""
+    return subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.PIPE,
+        text=True,
+        env=GIT_ENV
+    )
+
+def wait_for_git(proc: subprocess.Popen, cmd: List[str]) -> str:
+    """
+    Wait for a git command started with start_git and return its output.
+
+    Raises:
+        subprocess.CalledProcessError: If the command exited with a non-zero status
+    """
+    stdout, stderr = proc.communicate()
+    if proc.returncode != 0:
+        raise subprocess.CalledProcessError(proc.returncode, cmd, stdout, stderr)
+    return stdout
+
 def get_changed_files(diff_args: List[str] = None) -> List[Dict[str, str]]:
     """
     Get list of changed and untracked files.
-    Returns a list of dicts with 'path' and 'status' keys.
+    Returns a list of dicts with 'path' and 'status' keys, where status is
+    'modified', 'added', 'deleted' or 'untracked'.
     """
     if diff_args is None:
         diff_args = []
 
     changed_files = []
 
-    # Get modified/staged files
+    sanitized_args, pathspecs = sanitize_diff_args(diff_args)
+    diff_cmd = [GIT, "diff", "--name-status", "-z"] + sanitized_args
+    if pathspecs:
+        diff_cmd += ["--"] + pathspecs
+
+    # Use git ls-files for native untracked file detection
+    # --others: show untracked files
+    # --exclude-standard: respect .gitignore patterns
+    # -z: null-byte separated output for reliable parsing
+    untracked_cmd = [GIT, "ls-files", "--others", "--exclude-standard", "-z"]
+
+    # Start both git commands before waiting on either, so they run concurrently.
+    # Untracked files only matter if the diff involves the working tree.
+    diff_proc = start_git(diff_cmd)
+    untracked_proc = start_git(untracked_cmd) if involves_working_tree(diff_args) else None
+
+    # Get modified/staged files. --name-status reports how each file changed
+    # in the same call, so deletions and additions need no extra git commands.
+    # -z separates fields with NUL bytes and leaves paths unquoted.
     try:
-        sanitized_args, pathspecs = sanitize_diff_args(diff_args)
-        cmd = ["git", "diff", "--name-only"] + sanitized_args
-        if pathspecs:
-            cmd += ["--"] + pathspecs
-        result = subprocess.run(
-            cmd,
-            check=True,
-            capture_output=True,
-            text=True
-        )
-        for file_path in result.stdout.strip().split('\n'):
-            if file_path:  # Skip empty lines
-                changed_files.append({
-                    'path': file_path,
-                    'status': 'modified'
-                })
+        fields = wait_for_git(diff_proc, diff_cmd).split('\0')
+        i = 0
+        while i < len(fields) - 1:
+            status = fields[i]
+            # Renames and copies list the old and new path; the new one is what changed
+            if status[:1] in ('R', 'C'):
+                file_path = fields[i + 2]
+                i += 3
+            else:
+                file_path = fields[i + 1]
+                i += 2
+            changed_files.append({
+                'path': file_path,
+                'status': DIFF_STATUS_NAMES.get(status[:1], 'modified')
+            })
     except subprocess.CalledProcessError as e:
+        if untracked_proc:
+            untracked_proc.kill()
+            untracked_proc.wait()
         click.echo(f"Error getting modified files: {e}", err=True)
         sys.exit(1)
 
-    # Decide if we should include untracked files
-    if involves_working_tree(diff_args):
+    if untracked_proc:
         try:
-            # Use git ls-files for native untracked file detection
-            # --others: show untracked files
-            # --exclude-standard: respect .gitignore patterns
-            # -z: null-byte separated output for reliable parsing
-            result = subprocess.run(
-                ["git", "ls-files", "--others", "--exclude-standard", "-z"],
-                check=True,
-                capture_output=True,
-                text=True
-            )
+            output = wait_for_git(untracked_proc, untracked_cmd)
 
-            # Split on null byte and filter out empty strings
-            untracked_files = [path for path in result.stdout.split('\0') if path.strip()]
+            # Split on null byte and filter out the empty string after the final one
+            untracked_files = [path for path in output.split('\0') if path]
 
             for file_path in untracked_files:
                 changed_files.append({
@@ -86,46 +181,117 @@ def get_changed_files(diff_args: List[str] = None) -> List[Dict[str, str]]:
 
     return changed_files
 
-def load_file_contents(changed_files: List[Dict[str, str]], diff_args: List[str] = None) -> List[Dict[str, str]]:
+def read_untracked_file(file_path: str) -> Optional[str]:
+    """
+    Read the contents of an untracked file, up to MAX_UNTRACKED_BYTES.
+
+    The file is read with a single binary read and decoded once, instead of
+    going through a text-mode reader that decodes chunk by chunk.
+
+    Returns:
+        The file contents, or None if the file looks binary
+    """
+    if os.path.splitext(file_path)[1].lower() in BINARY_EXTENSIONS:
+        return None
+    with open(file_path, 'rb') as f:
+        # One byte past the limit tells us whether the file was cut short
+        data = f.read(MAX_UNTRACKED_BYTES + 1)
+    if data.find(b'\0', 0, BINARY_SNIFF_BYTES) != -1:
+        return None
+    if len(data) > MAX_UNTRACKED_BYTES:
+        return str(memoryview(data)[:MAX_UNTRACKED_BYTES], 'utf-8', 'replace') + "\n[... file truncated ...]\n"
+    return data.decode('utf-8', 'replace')
+
+def load_file_contents(changed_files: List[Dict[str, str]], diff_args: List[str] = None,
+                       progress_callback=None) -> List[Dict[str, str]]:
     """
     Load contents of changed files.
-    For modified files, gets the diff content.
+    For tracked files (modified, added or deleted), gets the diff content.
     For untracked files, reads the entire file.
+
+    progress_callback, if given, is called with the number of files finished
+    (always 1) as each file's content is loaded or fails to load.
     """
     if diff_args is None:
         diff_args = []
 
     files_with_content = []
 
-    for file_info in changed_files:
-        file_path = file_info['path']
-        status = file_info['status']
-
-        try:
-            if status == 'modified':
-                # Get diff content for modified files with sanitized args and proper separator
-                sanitized_args, _ = sanitize_diff_args(diff_args)
-                cmd = ["git", "diff"] + sanitized_args + ["--", file_path]
-                result = subprocess.run(
-                    cmd,
-                    check=True,
-                    capture_output=True,
-                    text=True
-                )
-                content = result.stdout
-            else:  # untracked
-                # Read entire file for untracked files
-                with open(file_path, 'r', encoding='utf-8', errors='replace') as f:
-                    content = f.read()
+    # Diff all tracked files in one git call and split the output per file.
+    # The output is split as it streams in, so the whole diff is never held
+    # as one string next to its per-file pieces.
+    sanitized_args, pathspecs = sanitize_diff_args(diff_args)
+    cmd = [GIT, "diff"] + sanitized_args
+    if pathspecs:
+        cmd += ["--"] + pathspecs
+    with subprocess.Popen(
+        cmd,
+        stdout=subprocess.PIPE,
+        stderr=subprocess.DEVNULL,
+        text=True,
+        env=GIT_ENV
+    ) as proc:
+        diffs_by_path = split_diff_by_file(proc.stdout)
+    if proc.returncode != 0:
+        # Every file falls back to its own diff, which reports the error
+        diffs_by_path = {}
+
+    # Untracked files are read on a thread pool while the tracked diffs are collected
+    with ThreadPoolExecutor(max_workers=UNTRACKED_READ_WORKERS) as executor:
+        loaded = []
+        pending_reads = []
+        for file_info in changed_files:
+            file_path = file_info['path']
+            status = file_info['status']
+
+            if status == 'untracked':
+                future = executor.submit(read_untracked_file, file_path)
+                pending_reads.append(future)
+                loaded.append((file_path, status, future))
+                continue
+
+            content = diffs_by_path.get(file_path)
+            if content is None:
+                # Renamed files and unusual headers fall back to a diff of just this file
+                try:
+                    cmd = [GIT, "diff"] + sanitized_args + ["--", file_path]
+                    result = subprocess.run(
+                        cmd,
+                        check=True,
+                        capture_output=True,
+                        text=True,
+                        env=GIT_ENV
+                    )
+                    content = result.stdout
+                except subprocess.CalledProcessError as e:
+                    click.echo(f"Error reading file {file_path}: {e}", err=True)
+                    content = None
+            if progress_callback:
+                progress_callback(1)
+            if content is not None:
+                loaded.append((file_path, status, content))
+
+        # Report reads as they finish, then collect them in the original order
+        if progress_callback:
+            for _ in as_completed(pending_reads):
+                progress_callback(1)
+
+        for file_path, status, content in loaded:
+            if isinstance(content, Future):
+                try:
+                    content = content.result()
+                except IOError as e:
+                    click.echo(f"Error reading file {file_path}: {e}", err=True)
+                    continue
+                if content is None:
+                    click.echo(f"Skipping binary file {file_path}", err=True)
+                    continue
 
             files_with_content.append({
                 'path': file_path,
                 'status': status,
                 'content': content
             })
-        except (subprocess.CalledProcessError, IOError) as e:
-            click.echo(f"Error reading file {file_path}: {e}", err=True)
-            continue
 
     return files_with_content
 
@@ -136,14 +302,25 @@ def load_file_contents(changed_files: List[Dict[str, str]], diff_args: List[str]
 @click.option('--output', '-o', default='diffgraph.html', help='Output HTML file path')
 @click.option('--no-open', is_flag=True, help='Do not open the HTML report automatically')
 @click.option('--debug-env', is_flag=True, help='Debug environment variable loading')
-def main(args, api_key: str, output: str, no_open: bool, debug_env: bool):
-    """wild - Git wrapper CLI with DiffGraph for diff commands."""
+@click.option('--no-cache', is_flag=True, help='Re-analyze all files instead of reusing cached results')
+def main(args, api_key: str, output: str, no_open: bool, debug_env: bool, no_cache: bool):
+    """wild - Git wrapper CLI with DiffGraph for diff commands.
+
+    Pass --verbose after diff (wild diff --verbose) to print the generated
+    diagram and unresolved dependencies during analysis.
+    """
 
     # Check if this is a diff command
     if args and args[0] == 'diff':
         # Handle diff command with custom logic
         diff_args = list(args[1:])  # Skip 'diff' and pass remaining args
 
+        # --verbose belongs to wild rather than git diff. It is only read here,
+        # so other git commands receive it untouched.
+        verbose = '--verbose' in diff_args
+        if verbose:
+            diff_args = [arg for arg in diff_args if arg != '--verbose']
+
         # Debug environment variable loading if requested
         if debug_env:
             debug_environment(api_key)
@@ -162,34 +339,41 @@ def main(args, api_key: str, output: str, no_open: bool, debug_env: bool):
 
         click.echo(f"📝 Found {len(changed_files)} changed files")
 
-        # Load contents of changed files with progress bar
-        with click.progressbar(changed_files, label='📖 Loading file contents') as files:
-            files_with_content = load_file_contents(files, diff_args)
+        # The analysis stack (pydantic and the agents SDK) is only
+        # imported once there is something to analyze, so passthrough
+        # commands and clean trees start quickly
+        from diffgraph.ai_analysis import CodeAnalysisAgent
+        from diffgraph.html_report import generate_html_report, AnalysisResult
+
+        # Load contents of changed files with progress bar. The bar advances as
+        # loads finish and redraws at most about 50 times.
+        with click.progressbar(length=len(changed_files), label='📖 Loading file contents',
+                               update_min_steps=max(1, len(changed_files) // 50)) as bar:
+            files_with_content = load_file_contents(changed_files, diff_args, progress_callback=bar.update)
 
         try:
             # Initialize the AI analysis agent
             click.echo("🤖 Initializing AI analysis...")
-            agent = CodeAnalysisAgent(api_key=api_key)
+            agent = CodeAnalysisAgent(api_key=api_key, use_cache=not no_cache, verbose=verbose)
 
             # Define progress callback
+            finished_files = 0
+
             def progress_callback(current_file, total_files, status):
+                nonlocal finished_files
                 if current_file is None:
                     click.echo("📊 Generating final diagram...")
                     return
 
-                file_name = os.path.basename(current_file)
-                current_index = len(agent.graph_manager.processed_files) + 1
-
-                if status == "processing":
-                    click.echo(f"🔄 Processing {file_name} ({current_index}/{total_files})...")
-                elif status == "analyzing":
-                    click.echo(f"🧠 Analyzing {file_name} with AI ({current_index}/{total_files})...")
-                elif status == "processing_components":
-                    click.echo(f"🔍 Processing components in {file_name} ({current_index}/{total_files})...")
-                elif status == "completed":
-                    click.echo(f"✅ Completed analysis of {file_name} ({current_index}/{total_files})...")
-                elif status == "error":
-                    click.echo(f"❌ Error analyzing {file_name} ({current_index}/{total_files})...")
+                message = PROGRESS_MESSAGES.get(status)
+                if message is None:
+                    return
+                if status in FINISHED_STATUSES:
+                    finished_files += 1
+                    current_index = finished_files
+                else:
+                    current_index = finished_files + 1
+                click.echo(message.format(name=os.path.basename(current_file), index=current_index, total=total_files))
 
             # Analyze the changes with progress updates
             click.echo("🧠 Starting code analysis...")
@@ -209,13 +393,12 @@ def main(args, api_key: str, output: str, no_open: bool, debug_env: bool):
 
             # Open the HTML report in the default browser
             if not no_open:
+                import webbrowser
+
                 click.echo("🌐 Opening report in browser...")
-                if sys.platform == 'darwin':  # macOS
-                    subprocess.run(['open', html_path])
-                elif sys.platform == 'win32':  # Windows
-                    os.startfile(html_path)
-                else:  # Linux
-                    subprocess.run(['xdg-open', html_path])
+                # webbrowser picks the platform's opener (open, xdg-open, startfile) itself
+                if not webbrowser.open(Path(html_path).as_uri()):
+                    click.echo(f"⚠️ Could not open a browser; open {html_path} manually", err=True)
 
         except ValueError as e:
             click.echo(f"❌ Error: {e}", err=True)
@@ -225,8 +408,9 @@ def main(args, api_key: str, output: str, no_open: bool, debug_env: bool):
             sys.exit(1)
     else:
         # Pass through to git for all other commands
+        git_args = list(args)
         try:
-            result = subprocess.run(["git"] + list(args))
+            result = subprocess.run([GIT] + git_args)
             sys.exit(result.returncode)
         except Exception as e:
             click.secho(f"❌ Error running git command: {e}", fg="red", err=True)
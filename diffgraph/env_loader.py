@@ -3,6 +3,7 @@ Environment variable loading utilities for DiffGraph CLI.
 Handles loading .env files in both development and bundled environments.
 """
 
+import functools
 import os
 import sys
 from typing import List, Optional
@@ -21,8 +22,9 @@ def get_bundle_directory() -> Optional[str]:
     return None
 
 
+@functools.lru_cache(maxsize=1)
 def get_possible_env_paths() -> List[str]:
-    """Get all possible paths where .env file might be located."""
+    """Get all possible paths where .env file might be located. Computed once per process."""
     possible_paths = [
         os.path.normpath(".env"),  # Current directory (development)
         os.path.normpath(os.path.join(os.path.dirname(__file__), "..", ".env")),  # Relative to module
@@ -38,8 +40,19 @@ def get_possible_env_paths() -> List[str]:
     return possible_paths
 
 
+_env_file_loaded = False
+
+
 def load_env_file():
-    """Load environment variables from .env file, handling both development and bundled environments."""
+    """
+    Load environment variables from .env file, handling both development and bundled environments.
+    Only the first call does any work; later calls return immediately.
+    """
+    global _env_file_loaded
+    if _env_file_loaded:
+        return
+    _env_file_loaded = True
+
     env_loaded = False
 
     # Try each possible path
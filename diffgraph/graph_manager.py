@@ -1,9 +1,24 @@
-from typing import Dict, List, Set, Optional
+from typing import Dict, List, Set, Optional, Tuple
+from collections import defaultdict
 from dataclasses import dataclass
 from enum import Enum
-import networkx as nx
 import re
 import html
+import sys
+
+def normalize_component_name(name: str) -> str:
+    """Normalize a component name for lookups: case-insensitive, without surrounding whitespace or call parentheses."""
+    name = name.strip()
+    if name.endswith("()"):
+        name = name[:-2]
+    return name.lower()
+
+# Graph nodes use __slots__ where dataclasses support it (Python 3.10+):
+# no per-instance __dict__ and faster attribute access
+_NODE_DATACLASS_OPTIONS = {"slots": True} if sys.version_info >= (3, 10) else {}
+
+# Consumed processing queue entries allowed to accumulate before they are dropped
+QUEUE_COMPACT_THRESHOLD = 1024
 
 class ChangeType(Enum):
     """Type of change in the code."""
@@ -12,6 +27,48 @@ class ChangeType(Enum):
     MODIFIED = "modified"  # Changed code/components
     UNCHANGED = "unchanged"  # Context nodes
 
+# Characters that may not appear in a Mermaid node id
+_MERMAID_ID_UNSAFE = re.compile(r'[^a-zA-Z0-9_]')
+
+# Mermaid style class names per change type, looked up instead of formatted per node
+_FILE_CLASSES = {change_type: f"file_{change_type.value}" for change_type in ChangeType}
+_COMPONENT_CLASSES = {change_type: f"component_{change_type.value}" for change_type in ChangeType}
+
+# Mermaid style class definitions appended to every diagram
+_MERMAID_CLASS_DEFS = "\n".join((
+    # Files (lighter shades)
+    "    %% Light mode styles",
+    "    classDef file_added fill:#90EE90,stroke:#333,stroke-width:2.5px,color:#000",  # Light green
+    "    classDef file_deleted fill:#FFB6C1,stroke:#333,stroke-width:2.5px,color:#000",  # Light red
+    "    classDef file_modified fill:#90cdf4,stroke:#333,stroke-width:2.5px,color:#000",  # Light blue
+    "    classDef file_unchanged fill:#D3D3D3,stroke:#333,stroke-width:2.5px,color:#000",  # Light gray
+
+    # Components (darker shades)
+    "    classDef component_added fill:#32CD32,stroke:#333,stroke-width:2.5px,color:#fff",  # Lime green
+    "    classDef component_deleted fill:#DC143C,stroke:#333,stroke-width:2.5px,color:#fff",  # Crimson
+    "    classDef component_modified fill:#3182ce,stroke:#333,stroke-width:2.5px,color:#fff",  # Blue
+    "    classDef component_unchanged fill:#808080,stroke:#333,stroke-width:2.5px,color:#fff",  # Gray
+
+    # Dark mode
+    "    %% Dark mode styles",
+    "    classDef dark_file_added fill:#2f855a,stroke:#276749,stroke-width:2.5px,color:#fff",  # Dark green
+    "    classDef dark_file_deleted fill:#c53030,stroke:#9b2c2c,stroke-width:2.5px,color:#fff",  # Dark red
+    "    classDef dark_file_modified fill:#2b6cb0,stroke:#2c5282,stroke-width:2.5px,color:#fff",  # Dark blue
+    "    classDef dark_file_unchanged fill:#4a5568,stroke:#2d3748,stroke-width:2.5px,color:#fff",  # Dark gray
+
+    "    classDef dark_component_added fill:#276749,stroke:#22543d,stroke-width:2.5px,color:#fff",  # Darker green
+    "    classDef dark_component_deleted fill:#9b2c2c,stroke:#822727,stroke-width:2.5px,color:#fff",  # Darker red
+    "    classDef dark_component_modified fill:#2c5282,stroke:#2a4365,stroke-width:2.5px,color:#fff",  # Darker blue
+    "    classDef dark_component_unchanged fill:#2d3748,stroke:#1a202c,stroke-width:2.5px,color:#fff",  # Darker gray
+
+    "    classDef hidden fill:none,stroke:none",
+))
+
+# Single-pass character rewrites for tooltips (whitespace escapes become spaces,
+# backticks and backslashes would break Mermaid) and for quoted node labels
+_TOOLTIP_TRANSLATION = str.maketrans({'\n': ' ', '\r': ' ', '\t': ' ', '`': None, '\\': None})
+_LABEL_TRANSLATION = str.maketrans({'"': '\\"', '`': '\\`'})
+
 class FileStatus(Enum):
     """Status of a file in the analysis process."""
     PENDING = "pending"      # Not yet processed
@@ -19,7 +76,7 @@ class FileStatus(Enum):
     PROCESSED = "processed"    # Analysis complete
     ERROR = "error"          # Error during analysis
 
-@dataclass
+@dataclass(**_NODE_DATACLASS_OPTIONS)
 class FileNode:
     """Represents a file node in the graph."""
     path: str
@@ -33,7 +90,7 @@ class FileNode:
         if self.components is None:
             self.components = []
 
-@dataclass
+@dataclass(**_NODE_DATACLASS_OPTIONS)
 class ComponentNode:
     """Represents a code component (function, class, etc.) in the graph."""
     name: str
@@ -42,26 +99,36 @@ class ComponentNode:
     component_type: str  # container, function, method
     parent: Optional[str] = None  # name of the parent component if nested
     summary: Optional[str] = None
-    dependencies: List[str] = None  # List of component names this depends on
-    dependents: List[str] = None    # List of component names that depend on this
+    dependencies: Set[str] = None  # Ids of the components this depends on
+    dependents: Set[str] = None    # Ids of the components that depend on this
+    component_id: str = None  # "<file_path>::<name>", the node's key in GraphManager.component_nodes
 
     def __post_init__(self):
+        if self.component_id is None:
+            self.component_id = f"{self.file_path}::{self.name}"
         if self.dependencies is None:
-            self.dependencies = []
+            self.dependencies = set()
         if self.dependents is None:
-            self.dependents = []
+            self.dependents = set()
 
 class GraphManager:
     """Manages the graph of file dependencies and analysis state."""
 
     def __init__(self):
         """Initialize an empty graph."""
-        self.file_graph = nx.DiGraph()  # Graph for file-level dependencies
-        self.component_graph = nx.DiGraph()  # Graph for component-level dependencies
+        # Component-level dependency edges (source id, target id), in the order they were added
+        self.component_edges: List[Tuple[str, str]] = []
         self.file_nodes: Dict[str, FileNode] = {}
         self.component_nodes: Dict[str, ComponentNode] = {}
-        self.processing_queue: List[str] = []  # BFS queue
-        self.processed_files: Set[str] = set()
+        self._components_by_name: Dict[str, List[ComponentNode]] = defaultdict(list)
+        self._components_by_file: Dict[str, List[ComponentNode]] = defaultdict(list)
+        # Parent component id -> ids of its nested components; the parent need not exist yet
+        self._component_children: Dict[str, List[str]] = defaultdict(list)
+        # BFS queue: append-only, with a cursor to the next entry instead of removing from the front
+        self.processing_queue: List[str] = []
+        self._queue_head = 0
+        # Last rendered diagram; reset to None by every change that affects it
+        self._mermaid_diagram: Optional[str] = None
 
     def _sanitize_tooltip(self, text: str) -> str:
         """
@@ -71,16 +138,9 @@ class GraphManager:
         if not text:
             return ""
 
-        # Replace escape sequences with spaces while preserving intentional spacing
-        text = text.replace('\n', ' ').replace('\r', ' ').replace('\t', ' ')
-
-        # Then escape HTML special characters
-        text = html.escape(text)
-
-        # Remove backticks and backslashes as they can break Mermaid syntax
-        text = text.replace('`', '').replace('\\', '')
-
-        return text
+        # Replace escape sequences with spaces and drop backticks and backslashes,
+        # then escape HTML special characters (which introduces neither)
+        return html.escape(text.translate(_TOOLTIP_TRANSLATION))
 
     def add_file(self, file_path: str, change_type: ChangeType) -> None:
         """Add a new file to the graph if it doesn't exist."""
@@ -90,58 +150,126 @@ class GraphManager:
                 status=FileStatus.PENDING,
                 change_type=change_type
             )
-            self.file_graph.add_node(file_path)
             self.processing_queue.append(file_path)
+            self._mermaid_diagram = None
 
-    def add_component(self, name: str, file_path: str, change_type: ChangeType, component_type: str, parent: Optional[str] = None, summary: str = None, dependencies: list = None, dependents: list = None) -> None:
-        """Add a new component to the graph."""
-        component_id = f"{file_path}::{name}"
-        # Clean up dependencies and dependents lists
-        dependencies = [d for d in (dependencies or []) if d]
-        dependents = [d for d in (dependents or []) if d]
+    def add_component(self, name: str, file_path: str, change_type: ChangeType, component_type: str, parent: Optional[str] = None, summary: str = None) -> None:
+        """
+        Add a new component to the graph.
+
+        Relationships between components are added separately with
+        add_component_dependency once both ends are known.
+        """
+        # Interned so the id stored in edges, dependency sets and the node map is
+        # one shared string object, and repeated equality checks short-circuit on identity
+        component_id = sys.intern(f"{file_path}::{name}")
+        self._mermaid_diagram = None
 
         if component_id not in self.component_nodes:
-            self.component_nodes[component_id] = ComponentNode(
+            node = ComponentNode(
                 name=name,
                 file_path=file_path,
                 change_type=change_type,
                 component_type=component_type,
                 parent=parent,
                 summary=summary,
-                dependencies=dependencies,
-                dependents=dependents
+                component_id=component_id
             )
-            self.component_graph.add_node(component_id)
+            self.component_nodes[component_id] = node
+            self._components_by_name[normalize_component_name(name)].append(node)
+            self._components_by_file[file_path].append(node)
+            if parent:
+                self._component_children[f"{file_path}::{parent}"].append(component_id)
         else:
             # Update existing component
             existing = self.component_nodes[component_id]
             existing.summary = summary or existing.summary
-            existing.dependencies = dependencies or existing.dependencies
-            existing.dependents = dependents or existing.dependents
             existing.component_type = component_type
+            if parent != existing.parent:
+                if existing.parent:
+                    self._component_children[f"{file_path}::{existing.parent}"].remove(component_id)
+                if parent:
+                    self._component_children[f"{file_path}::{parent}"].append(component_id)
             existing.parent = parent
 
+    def get_components_by_name(self, name: str) -> List[ComponentNode]:
+        """Get all components whose normalized name matches name, in insertion order."""
+        return self._components_by_name.get(normalize_component_name(name), [])
+
+    def get_file_components(self, file_path: str) -> List[ComponentNode]:
+        """Get all components in a file, in insertion order."""
+        return self._components_by_file.get(file_path, [])
+
     def add_component_dependency(self, source: str, target: str) -> None:
         """Add a dependency relationship between components."""
         if not source or not target or source == target:
             return
 
         if source in self.component_nodes and target in self.component_nodes:
-            if not self.component_graph.has_edge(source, target):
-                self.component_graph.add_edge(source, target)
-                if target not in self.component_nodes[source].dependencies:
-                    self.component_nodes[source].dependencies.append(target)
-                if source not in self.component_nodes[target].dependents:
-                    self.component_nodes[target].dependents.append(source)
+            # Store the same interned strings add_component used as keys
+            source, target = sys.intern(source), sys.intern(target)
+            source_node = self.component_nodes[source]
+            if target not in source_node.dependencies:
+                source_node.dependencies.add(target)
+                self.component_nodes[target].dependents.add(source)
+                self.component_edges.append((source, target))
+                self._mermaid_diagram = None
+
+    def has_path(self, source: str, target: str) -> bool:
+        """Check whether target can be reached from source by following dependencies."""
+        if source not in self.component_nodes or target not in self.component_nodes:
+            return False
+        visited = {source}
+        stack = [source]
+        while stack:
+            current = stack.pop()
+            if current == target:
+                return True
+            for dep in self.component_nodes[current].dependencies:
+                if dep not in visited:
+                    visited.add(dep)
+                    stack.append(dep)
+        return False
 
     def get_next_file(self) -> Optional[str]:
         """Get the next file to process from the queue."""
-        while self.processing_queue:
-            file_path = self.processing_queue.pop(0)
-            if file_path not in self.processed_files:
+        queue = self.processing_queue
+        while self._queue_head < len(queue):
+            file_path = queue[self._queue_head]
+            self._queue_head += 1
+            # The file status is the single record of whether a file was handled
+            if self.file_nodes[file_path].status is FileStatus.PENDING:
+                self._compact_queue()
                 return file_path
+        self._compact_queue()
         return None
 
+    def get_next_files(self, limit: Optional[int] = None) -> List[str]:
+        """
+        Take up to limit pending files from the queue in one call.
+
+        Args:
+            limit: Maximum number of files to return, or None to drain the queue
+
+        Returns:
+            Paths of the pending files, in queue order
+        """
+        queue = self.processing_queue
+        files = []
+        while self._queue_head < len(queue) and (limit is None or len(files) < limit):
+            file_path = queue[self._queue_head]
+            self._queue_head += 1
+            if self.file_nodes[file_path].status is FileStatus.PENDING:
+                files.append(file_path)
+        self._compact_queue()
+        return files
+
+    def _compact_queue(self) -> None:
+        """Drop consumed entries from the front of the queue once enough of them pile up."""
+        if self._queue_head >= QUEUE_COMPACT_THRESHOLD and self._queue_head * 2 >= len(self.processing_queue):
+            del self.processing_queue[:self._queue_head]
+            self._queue_head = 0
+
     def mark_processing(self, file_path: str) -> None:
         """Mark a file as being processed."""
         if file_path in self.file_nodes:
@@ -153,151 +281,139 @@ class GraphManager:
             self.file_nodes[file_path].status = FileStatus.PROCESSED
             self.file_nodes[file_path].summary = summary
             self.file_nodes[file_path].components = components
-            self.processed_files.add(file_path)
 
     def mark_error(self, file_path: str, error: str) -> None:
         """Mark a file as having an error during processing."""
         if file_path in self.file_nodes:
             self.file_nodes[file_path].status = FileStatus.ERROR
             self.file_nodes[file_path].error = error
-            self.processed_files.add(file_path)
+            self._mermaid_diagram = None
 
     def get_connected_components(self, start_component: str, max_depth: int = 3) -> Set[str]:
         """Get all components connected to the start component within max_depth."""
-        connected = set()
-        queue = [(start_component, 0)]  # (component_id, depth)
-
-        while queue:
-            current, depth = queue.pop(0)
-            if depth > max_depth:
-                continue
-
-            connected.add(current)
-
-            # Add dependencies
-            for dep in self.component_nodes[current].dependencies:
-                if dep not in connected:
-                    queue.append((dep, depth + 1))
-
-            # Add dependents
-            for dep in self.component_nodes[current].dependents:
-                if dep not in connected:
-                    queue.append((dep, depth + 1))
+        # Expand one BFS layer at a time with set unions, so the per-neighbor
+        # work happens inside the set implementation rather than in Python
+        connected = {start_component}
+        frontier = {start_component}
+
+        for _ in range(max_depth):
+            next_frontier = set()
+            for current in frontier:
+                node = self.component_nodes[current]
+                next_frontier |= node.dependencies
+                next_frontier |= node.dependents
+            next_frontier -= connected
+            if not next_frontier:
+                break
+            connected |= next_frontier
+            # Every component has been reached; further layers cannot add any
+            if len(connected) == len(self.component_nodes):
+                break
+            frontier = next_frontier
 
         return connected
 
     def get_mermaid_diagram(self) -> str:
         """Generate a Mermaid diagram representation of the graph."""
-        mermaid = ["graph LR"]
+        # Rendering only reads the graph, so an unchanged graph reuses the last result
+        if self._mermaid_diagram is None:
+            self._mermaid_diagram = self._render_mermaid_diagram()
+        return self._mermaid_diagram
 
-        # Group components by their file paths and create a hierarchy
-        file_components = {}
-        component_hierarchy = {}  # parent -> children mapping
+    def _render_mermaid_diagram(self) -> str:
+        """Render the Mermaid diagram for the current state of the graph."""
+        mermaid = ["graph LR"]
 
-        for component_id, node in self.component_nodes.items():
-            if node.file_path not in file_components:
-                file_components[node.file_path] = []
-            file_components[node.file_path].append((component_id, node))
+        # Sanitize each component id once; edges and nested components reuse them
+        component_ids = {
+            component_id: _MERMAID_ID_UNSAFE.sub('_', component_id)
+            for component_id in self.component_nodes
+        }
 
-            # If this component has a parent, add it to the hierarchy
-            if hasattr(node, 'parent') and node.parent:
-                parent_id = f"{node.file_path}::{node.parent}"
-                if parent_id not in component_hierarchy:
-                    component_hierarchy[parent_id] = []
-                component_hierarchy[parent_id].append(component_id)
+        # Sanitize each distinct summary once; repeated summaries share the result
+        tooltips = {
+            summary: self._sanitize_tooltip(summary)
+            for summary in {node.summary for node in self.component_nodes.values() if node.summary}
+        }
 
         # Add file nodes as subgraphs with their components inside
         for file_path, node in self.file_nodes.items():
             # Create a valid ID for the file node
-            file_id = re.sub(r'[^a-zA-Z0-9_]', '_', file_path)
+            file_id = _MERMAID_ID_UNSAFE.sub('_', file_path)
 
             # Create a properly escaped label
-            file_label = file_path.replace('"', '\\"').replace('`', '\\`')
+            file_label = file_path.translate(_LABEL_TRANSLATION)
             if node.error:
                 file_label += f"<br/>(Error: {node.error})"
 
             mermaid.append(f'    subgraph {file_id}["{file_label}"]')
             mermaid.append(f'        direction TB')
-            mermaid.append(f'        class {file_id} file_{node.change_type.value}')
-
-            # Add components within this file
-            if file_path in file_components:
-                # First add container components
-                for component_id, comp_node in file_components[file_path]:
-                    if hasattr(comp_node, 'component_type') and comp_node.component_type == 'container':
-                        comp_id = re.sub(r'[^a-zA-Z0-9_]', '_', component_id)
-                        component_label = comp_node.name.replace('"', '\\"').replace('`', '\\`')
-
-                        # Create a subgraph for the container
-                        mermaid.append(f'        subgraph {comp_id}["{component_label}"]')
-                        mermaid.append(f'            direction TB')
-                        mermaid.append(f'            class {comp_id} component_{comp_node.change_type.value}')
-
-                        # Add nested components if any
-                        if component_id in component_hierarchy:
-                            for nested_id in component_hierarchy[component_id]:
-                                nested_node = self.component_nodes[nested_id]
-                                nested_comp_id = re.sub(r'[^a-zA-Z0-9_]', '_', nested_id)
-                                nested_label = nested_node.name.replace('"', '\\"').replace('`', '\\`')
-                                if nested_node.summary:
-                                    mermaid.append(f'            {nested_comp_id}["{nested_label}"]:::component_{nested_node.change_type.value}')
-                                    sanitized_summary = self._sanitize_tooltip(nested_node.summary)
-                                    mermaid.append(f'            click {nested_comp_id} call callback("{sanitized_summary}") "{sanitized_summary}"')
-                                else:
-                                    mermaid.append(f'            {nested_comp_id}["{nested_label}"]:::component_{nested_node.change_type.value}')
-                                mermaid.append(f'            class {nested_comp_id} component_{nested_node.change_type.value}')
-
-                        mermaid.append('        end')
-                        mermaid.append(f'        {comp_id}:::component_{comp_node.change_type.value}')
-
-                # Then add standalone components (functions, methods without containers)
-                for component_id, comp_node in file_components[file_path]:
-                    if not hasattr(comp_node, 'component_type') or comp_node.component_type != 'container':
-                        if not hasattr(comp_node, 'parent') or not comp_node.parent:  # Only add if not nested
-                            comp_id = re.sub(r'[^a-zA-Z0-9_]', '_', component_id)
-                            component_label = comp_node.name.replace('"', '\\"').replace('`', '\\`')
-                            if comp_node.summary:
-                                mermaid.append(f'        {comp_id}["{component_label}"]:::component_{comp_node.change_type.value}')
-                                sanitized_summary = self._sanitize_tooltip(comp_node.summary)
-                                mermaid.append(f'        click {comp_id} call callback("{sanitized_summary}") "{sanitized_summary}"')
-                            else:
-                                mermaid.append(f'        {comp_id}["{component_label}"]:::component_{comp_node.change_type.value}')
-                            mermaid.append(f'        class {comp_id} component_{comp_node.change_type.value}')
+            mermaid.append(f'        class {file_id} {_FILE_CLASSES[node.change_type]}')
+
+            # Classify this file's components once as containers or standalone
+            # components (functions, methods without containers)
+            containers = []
+            standalone = []
+            for comp_node in self._components_by_file.get(file_path, ()):
+                if comp_node.component_type == 'container':
+                    containers.append(comp_node)
+                elif not comp_node.parent:  # Nested components are added with their container
+                    standalone.append(comp_node)
+
+            # Add components within this file, containers first
+            for comp_node in containers:
+                component_id = comp_node.component_id
+                comp_id = component_ids[component_id]
+                component_label = comp_node.name.translate(_LABEL_TRANSLATION)
+
+                # Create a subgraph for the container
+                mermaid.append(f'        subgraph {comp_id}["{component_label}"]')
+                mermaid.append(f'            direction TB')
+                mermaid.append(f'            class {comp_id} {_COMPONENT_CLASSES[comp_node.change_type]}')
+
+                # Add nested components if any
+                if component_id in self._component_children:
+                    for nested_id in self._component_children[component_id]:
+                        nested_node = self.component_nodes[nested_id]
+                        nested_comp_id = component_ids[nested_id]
+                        nested_label = nested_node.name.translate(_LABEL_TRANSLATION)
+                        if nested_node.summary:
+                            mermaid.append(f'            {nested_comp_id}["{nested_label}"]:::{_COMPONENT_CLASSES[nested_node.change_type]}')
+                            sanitized_summary = tooltips[nested_node.summary]
+                            mermaid.append(f'            click {nested_comp_id} call callback("{sanitized_summary}") "{sanitized_summary}"')
+                        else:
+                            mermaid.append(f'            {nested_comp_id}["{nested_label}"]:::{_COMPONENT_CLASSES[nested_node.change_type]}')
+                        mermaid.append(f'            class {nested_comp_id} {_COMPONENT_CLASSES[nested_node.change_type]}')
+
+                mermaid.append('        end')
+                mermaid.append(f'        {comp_id}:::{_COMPONENT_CLASSES[comp_node.change_type]}')
+
+            # Then add standalone components
+            for comp_node in standalone:
+                comp_id = component_ids[comp_node.component_id]
+                component_label = comp_node.name.translate(_LABEL_TRANSLATION)
+                if comp_node.summary:
+                    mermaid.append(f'        {comp_id}["{component_label}"]:::{_COMPONENT_CLASSES[comp_node.change_type]}')
+                    sanitized_summary = tooltips[comp_node.summary]
+                    mermaid.append(f'        click {comp_id} call callback("{sanitized_summary}") "{sanitized_summary}"')
+                else:
+                    mermaid.append(f'        {comp_id}["{component_label}"]:::{_COMPONENT_CLASSES[comp_node.change_type]}')
+                mermaid.append(f'        class {comp_id} {_COMPONENT_CLASSES[comp_node.change_type]}')
 
             mermaid.append('    end')
-            mermaid.append(f'    {file_id}:::file_{node.change_type.value}')
-
-        # Add edges between components
-        for source, target in self.component_graph.edges():
-            source_id = re.sub(r'[^a-zA-Z0-9_]', '_', source)
-            target_id = re.sub(r'[^a-zA-Z0-9_]', '_', target)
-            mermaid.append(f'    {source_id} --> {target_id}')
-
-        # Add style definitions for files (lighter shades)
-        mermaid.append("    %% Light mode styles")
-        mermaid.append("    classDef file_added fill:#90EE90,stroke:#333,stroke-width:2.5px,color:#000")  # Light green
-        mermaid.append("    classDef file_deleted fill:#FFB6C1,stroke:#333,stroke-width:2.5px,color:#000")  # Light red
-        mermaid.append("    classDef file_modified fill:#90cdf4,stroke:#333,stroke-width:2.5px,color:#000")  # Light blue
-        mermaid.append("    classDef file_unchanged fill:#D3D3D3,stroke:#333,stroke-width:2.5px,color:#000")  # Light gray
-
-        # Add style definitions for components (darker shades)
-        mermaid.append("    classDef component_added fill:#32CD32,stroke:#333,stroke-width:2.5px,color:#fff")  # Lime green
-        mermaid.append("    classDef component_deleted fill:#DC143C,stroke:#333,stroke-width:2.5px,color:#fff")  # Crimson
-        mermaid.append("    classDef component_modified fill:#3182ce,stroke:#333,stroke-width:2.5px,color:#fff")  # Blue
-        mermaid.append("    classDef component_unchanged fill:#808080,stroke:#333,stroke-width:2.5px,color:#fff")  # Gray
-
-        # Add dark mode styles
-        mermaid.append("    %% Dark mode styles")
-        mermaid.append("    classDef dark_file_added fill:#2f855a,stroke:#276749,stroke-width:2.5px,color:#fff")  # Dark green
-        mermaid.append("    classDef dark_file_deleted fill:#c53030,stroke:#9b2c2c,stroke-width:2.5px,color:#fff")  # Dark red
-        mermaid.append("    classDef dark_file_modified fill:#2b6cb0,stroke:#2c5282,stroke-width:2.5px,color:#fff")  # Dark blue
-        mermaid.append("    classDef dark_file_unchanged fill:#4a5568,stroke:#2d3748,stroke-width:2.5px,color:#fff")  # Dark gray
-
-        mermaid.append("    classDef dark_component_added fill:#276749,stroke:#22543d,stroke-width:2.5px,color:#fff")  # Darker green
-        mermaid.append("    classDef dark_component_deleted fill:#9b2c2c,stroke:#822727,stroke-width:2.5px,color:#fff")  # Darker red
-        mermaid.append("    classDef dark_component_modified fill:#2c5282,stroke:#2a4365,stroke-width:2.5px,color:#fff")  # Darker blue
-        mermaid.append("    classDef dark_component_unchanged fill:#2d3748,stroke:#1a202c,stroke-width:2.5px,color:#fff")  # Darker gray
-
-        mermaid.append("    classDef hidden fill:none,stroke:none")
+            mermaid.append(f'    {file_id}:::{_FILE_CLASSES[node.change_type]}')
+
+        # Add edges between components, one line per source using Mermaid's
+        # "A --> B & C" syntax; sources and targets keep the order edges were added
+        edge_targets = defaultdict(list)
+        for source, target in self.component_edges:
+            edge_targets[source].append(component_ids[target])
+        mermaid.extend(
+            f'    {component_ids[source]} --> {" & ".join(targets)}'
+            for source, targets in edge_targets.items()
+        )
+
+        # Add style definitions for files and components in light and dark mode
+        mermaid.append(_MERMAID_CLASS_DEFS)
 
         return "\n".join(mermaid)
\ No newline at end of file
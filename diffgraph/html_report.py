@@ -6,18 +6,9 @@ class AnalysisResult(NamedTuple):
     summary: str
     mermaid_diagram: str
 
-def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph.html") -> str:
-    """
-    Generate an HTML report with the analysis summary and Mermaid diagram.
-
-    Args:
-        analysis: AnalysisResult containing summary and mermaid diagram
-        output_path: Path where the HTML file should be saved
-
-    Returns:
-        Path to the generated HTML file
-    """
-    html_template = """<!DOCTYPE html>
+# Report page. CSS and JavaScript braces are literal; the two placeholders are
+# split out once at import instead of running str.format over the page per report
+HTML_TEMPLATE = """<!DOCTYPE html>
 <html lang="en">
 <head>
     <meta charset="UTF-8">
@@ -29,12 +20,12 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
     <script src="https://cdnjs.cloudflare.com/ajax/libs/highlight.js/11.9.0/highlight.min.js"></script>
     <script src="https://cdnjs.cloudflare.com/ajax/libs/marked/11.1.1/marked.min.js"></script>
     <style>
-        :root {{
+        :root {
             color-scheme: light dark;
-        }}
+        }
 
-        @media (prefers-color-scheme: dark) {{
-            :root {{
+        @media (prefers-color-scheme: dark) {
+            :root {
                 --bg-primary: #1a202c;
                 --text-primary: #f7fafc;
                 --bg-secondary: #2d3748;
@@ -42,68 +33,68 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
                 --tooltip-bg: #2d3748;
                 --tooltip-text: #f7fafc;
                 --tooltip-border: #4a5568;
-            }}
-            body {{
+            }
+            body {
                 color-scheme: dark;
-            }}
-            .mermaid .node {{
+            }
+            .mermaid .node {
                 fill: var(--bg-secondary) !important;
-            }}
-            .mermaid .node text {{
+            }
+            .mermaid .node text {
                 fill: var(--text-primary) !important;
-            }}
-            .mermaid .edgePath .path {{
+            }
+            .mermaid .edgePath .path {
                 stroke: var(--border-color) !important;
-            }}
-            .mermaid .edgeLabel {{
+            }
+            .mermaid .edgeLabel {
                 background-color: var(--bg-secondary) !important;
                 color: var(--text-primary) !important;
-            }}
+            }
             /* Apply dark mode classes */
-            .mermaid .file_added {{
+            .mermaid .file_added {
                 fill: #2f855a !important;
                 stroke: #276749 !important;
                 color: #fff !important;
-            }}
-            .mermaid .file_deleted {{
+            }
+            .mermaid .file_deleted {
                 fill: #c53030 !important;
                 stroke: #9b2c2c !important;
                 color: #fff !important;
-            }}
-            .mermaid .file_modified {{
+            }
+            .mermaid .file_modified {
                 fill: #2b6cb0 !important;
                 stroke: #2c5282 !important;
                 color: #fff !important;
-            }}
-            .mermaid .file_unchanged {{
+            }
+            .mermaid .file_unchanged {
                 fill: #4a5568 !important;
                 stroke: #2d3748 !important;
                 color: #fff !important;
-            }}
-            .mermaid .component_added {{
+            }
+            .mermaid .component_added {
                 fill: #276749 !important;
                 stroke: #22543d !important;
                 color: #fff !important;
-            }}
-            .mermaid .component_deleted {{
+            }
+            .mermaid .component_deleted {
                 fill: #9b2c2c !important;
                 stroke: #822727 !important;
                 color: #fff !important;
-            }}
-            .mermaid .component_modified {{
+            }
+            .mermaid .component_modified {
                 fill: #2c5282 !important;
                 stroke: #2a4365 !important;
                 color: #fff !important;
-            }}
-            .mermaid .component_unchanged {{
+            }
+            .mermaid .component_unchanged {
                 fill: #2d3748 !important;
                 stroke: #1a202c !important;
                 color: #fff !important;
-            }}
-        }}
+            }
+        }
 
-        @media (prefers-color-scheme: light) {{
-            :root {{
+        @media (prefers-color-scheme: light) {
+            :root {
                 --bg-primary: #ffffff;
                 --text-primary: #1a202c;
                 --bg-secondary: #f8f9fa;
@@ -117,10 +108,10 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
                 --tooltip-bg: #ffffff;
                 --tooltip-text: #1a202c;
                 --tooltip-border: #e2e8f0;
-            }}
-        }}
+            }
+        }
 
-        body {{
+        body {
             font-family: -apple-system, BlinkMacSystemFont, 'Segoe UI', Roboto, 'Helvetica Neue', Arial, sans-serif;
             line-height: 1.6;
             color: var(--text-primary);
@@ -129,137 +120,137 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
             margin: 0 auto;
             padding: 2rem;
             transition: background-color 0.3s, color 0.3s;
-        }}
+        }
 
-        .mermaid {{
+        .mermaid {
             background: var(--mermaid-bg);
             padding: 1.5rem;
             border-radius: 0.75rem;
             margin: 1.5rem 0;
             border: 1px solid var(--border-color);
 
-            .node, .cluster {{
+            .node, .cluster {
                 rect,
                 circle,
                 ellipse,
                 polygon,
-                path {{
+                path {
                     fill: var(--mermaid-node-bg) !important;
                     stroke: var(--mermaid-node-border) !important;
                     rx: 12px !important;
                     ry: 12px !important;
                     filter: drop-shadow(0 2px 8px #0002);
                     stroke-width: 2.5px !important;
-                }}
-            }}
-        }}
+                }
+            }
+        }
 
-        .mermaid .node text {{
+        .mermaid .node text {
             fill: var(--mermaid-node-text) !important;
             font-weight: 600;
             font-size: 1.05em;
             letter-spacing: 0.01em;
-        }}
+        }
 
-        .mermaid .edgePath .path {{
+        .mermaid .edgePath .path {
             stroke: var(--mermaid-edge) !important;
             stroke-width: 2.2px !important;
             opacity: 0.92;
-        }}
+        }
 
-        .mermaid .edgeLabel {{
+        .mermaid .edgeLabel {
             background-color: var(--mermaid-bg) !important;
             color: var(--mermaid-text) !important;
             border-radius: 0.5em;
             padding: 0.1em 0.5em;
             font-size: 0.98em;
             box-shadow: 0 1px 4px #0001;
-        }}
+        }
 
         .mermaid .node rect,
         .mermaid .node circle,
         .mermaid .node ellipse,
         .mermaid .node polygon,
-        .mermaid .node path {{
+        .mermaid .node path {
             fill: var(--mermaid-node-bg) !important;
             stroke: var(--mermaid-node-border) !important;
-        }}
+        }
 
-        .mermaid .node text {{
+        .mermaid .node text {
             fill: var(--mermaid-node-text) !important;
-        }}
+        }
 
-        .mermaid .edgePath .path {{
+        .mermaid .edgePath .path {
             stroke: var(--mermaid-edge) !important;
-        }}
+        }
 
-        .mermaid .edgeLabel {{
+        .mermaid .edgeLabel {
             background-color: var(--mermaid-bg) !important;
             color: var(--mermaid-text) !important;
-        }}
+        }
 
-        .summary {{
+        .summary {
             background: var(--bg-secondary);
             padding: 1.5rem;
             border-radius: 0.75rem;
             box-shadow: 0 1px 3px rgba(0,0,0,0.1);
             margin-bottom: 2rem;
             border: 1px solid var(--border-color);
-        }}
+        }
 
-        h1 {{
+        h1 {
             color: var(--text-primary);
             font-size: 2.5rem;
             font-weight: 700;
             margin-bottom: 1.5rem;
-        }}
+        }
 
-        h2 {{
+        h2 {
             color: var(--text-primary);
             font-size: 1.8rem;
             font-weight: 600;
             margin-bottom: 1rem;
-        }}
+        }
 
-        pre {{
+        pre {
             background: var(--bg-secondary);
             padding: 1rem;
             border-radius: 0.75rem;
             overflow-x: auto;
             border: 1px solid var(--border-color);
-        }}
+        }
 
-        code {{
+        code {
             font-family: 'SFMono-Regular', Consolas, 'Liberation Mono', Menlo, monospace;
-        }}
+        }
 
-        .markdown-content {{
+        .markdown-content {
             color: var(--text-primary);
-        }}
+        }
 
-        .markdown-content p {{
+        .markdown-content p {
             margin-bottom: 1rem;
-        }}
+        }
 
-        .markdown-content ul {{
+        .markdown-content ul {
             list-style-type: disc;
             margin-left: 1.5rem;
             margin-bottom: 1rem;
-        }}
+        }
 
-        .markdown-content li {{
+        .markdown-content li {
             margin-bottom: 0.5rem;
-        }}
+        }
 
-        .markdown-content code {{
+        .markdown-content code {
             background: var(--bg-secondary);
             padding: 0.2rem 0.4rem;
             border-radius: 0.25rem;
             font-size: 0.875em;
-        }}
+        }
 
         /* Tooltip styles */
-        .tooltip {{
+        .tooltip {
             position: fixed;
             background: var(--tooltip-bg, #ffffff);
             border: 1px solid var(--tooltip-border, #e2e8f0);
@@ -270,13 +261,13 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
             z-index: 1000;
             display: none;
             color: var(--tooltip-text, #1a202c);
-        }}
+        }
 
-        .tooltip.visible {{
+        .tooltip.visible {
             display: block;
-        }}
+        }
 
-        .mermaidTooltip {{
+        .mermaidTooltip {
             position: absolute;
             text-align: center;
             max-width: 200px;
@@ -289,7 +280,7 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
             border-radius: 2px;
             pointer-events: none;
             z-index: 100;
-        }}
+        }
     </style>
 </head>
 <body>
@@ -311,16 +302,16 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
     <script>
         // Initialize Mermaid with system theme
         const isDarkMode = window.matchMedia('(prefers-color-scheme: dark)').matches;
-        mermaid.initialize({{
+        mermaid.initialize({
             startOnLoad: true,
             theme: isDarkMode ? 'dark' : 'default',
             securityLevel: 'loose',
-            flowchart: {{
+            flowchart: {
                 useMaxWidth: true,
                 htmlLabels: true,
                 curve: 'basis'
-            }},
-            themeVariables: {{
+            },
+            themeVariables: {
                 darkMode: isDarkMode,
                 fontFamily: '-apple-system, BlinkMacSystemFont, "Segoe UI", Roboto, "Helvetica Neue", Arial, sans-serif',
                 fontSize: '16px',
@@ -341,61 +332,79 @@ def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph
                 titleColor: isDarkMode ? '#f7fafc' : '#1a202c',
                 edgeLabelBackground: isDarkMode ? '#2d3748' : '#f8f9fa',
                 edgeLabelColor: isDarkMode ? '#f7fafc' : '#1a202c'
-            }}
-        }});
+            }
+        });
 
         // Initialize syntax highlighting
-        document.addEventListener('DOMContentLoaded', (event) => {{
-            document.querySelectorAll('pre code').forEach((block) => {{
+        document.addEventListener('DOMContentLoaded', (event) => {
+            document.querySelectorAll('pre code').forEach((block) => {
                 hljs.highlightBlock(block);
-            }});
-        }});
+            });
+        });
 
         // Convert markdown to HTML
-        document.addEventListener('DOMContentLoaded', (event) => {{
+        document.addEventListener('DOMContentLoaded', (event) => {
             const summaryContent = document.getElementById('summary-content');
             summaryContent.innerHTML = marked.parse(summaryContent.textContent);
-        }});
+        });
 
         // Tooltip handling
-        window.showTooltip = function(text) {{
+        window.showTooltip = function(text) {
             const tooltip = document.getElementById('tooltip');
             tooltip.innerHTML = marked.parse(text); // Parse markdown in tooltip
             tooltip.classList.add('visible');
-        }}
+        }
 
-        window.hideTooltip = function() {{
+        window.hideTooltip = function() {
             const tooltip = document.getElementById('tooltip');
             tooltip.classList.remove('visible');
-        }}
+        }
 
         // Mermaid click callback
-        window.callback = function(text) {{
+        window.callback = function(text) {
             showTooltip(text);
-        }}
+        }
 
         // Add click handlers for component nodes
-        document.addEventListener('DOMContentLoaded', (event) => {{
+        document.addEventListener('DOMContentLoaded', (event) => {
             // Hide tooltip when clicking outside
-            document.addEventListener('click', (e) => {{
-                if (!e.target.closest('.node')) {{
+            document.addEventListener('click', (e) => {
+                if (!e.target.closest('.node')) {
                     hideTooltip();
-                }}
-            }});
-        }});
+                }
+            });
+        });
     </script>
 </body>
 </html>
 """
 
-    # Format the template with the analysis results
-    html_content = html_template.format(
-        summary=analysis.summary,
-        mermaid_diagram=analysis.mermaid_diagram
-    )
+_TEMPLATE_HEAD, _rest = HTML_TEMPLATE.split("{mermaid_diagram}")
+_TEMPLATE_MIDDLE, _TEMPLATE_TAIL = _rest.split("{summary}")
+del _rest
 
-    # Write the HTML file
-    with open(output_path, 'w', encoding='utf-8') as f:
-        f.write(html_content)
+def generate_html_report(analysis: AnalysisResult, output_path: str = "diffgraph.html") -> str:
+    """
+    Generate an HTML report with the analysis summary and Mermaid diagram.
+
+    Args:
+        analysis: AnalysisResult containing summary and mermaid diagram
+        output_path: Path where the HTML file should be saved
+
+    Returns:
+        Path to the generated HTML file
+    """
+    # Splice the analysis results between the pre-split template pieces
+    html_content = "".join((
+        _TEMPLATE_HEAD,
+        analysis.mermaid_diagram,
+        _TEMPLATE_MIDDLE,
+        analysis.summary,
+        _TEMPLATE_TAIL,
+    ))
+
+    # Write the HTML file as UTF-8 bytes in one call, without newline translation
+    with open(output_path, 'wb') as f:
+        f.write(html_content.encode('utf-8'))
 
     return os.path.abspath(output_path)
\ No newline at end of file
@@ -0,0 +1,89 @@
+"""
+Client-side rate limiting for OpenAI requests.
+Tracks the request and token budgets reported in OpenAI's x-ratelimit-* response
+headers and holds new requests back until the budget allows them, instead of
+waiting for a RateLimitError.
+"""
+
+import asyncio
+import re
+import time
+from typing import Mapping, Optional
+
+# Matches the components of OpenAI reset durations such as "1s", "6m0s" or "120ms"
+_DURATION_PART = re.compile(r"(\d+(?:\.\d+)?)(ms|h|m|s)")
+_DURATION_UNITS = {"ms": 0.001, "s": 1.0, "m": 60.0, "h": 3600.0}
+
+
+def parse_reset_duration(value: str) -> Optional[float]:
+    """Parse an x-ratelimit-reset-* header value into seconds."""
+    parts = _DURATION_PART.findall(value or "")
+    if not parts:
+        return None
+    return sum(float(amount) * _DURATION_UNITS[unit] for amount, unit in parts)
+
+
+class RateLimiter:
+    """Proactive limiter for requests-per-minute and tokens-per-minute budgets."""
+
+    def __init__(self):
+        """Initialize the limiter. Budgets are unknown until the first response arrives."""
+        self.remaining_requests: Optional[int] = None
+        self.remaining_tokens: Optional[int] = None
+        self._requests_reset_at = 0.0
+        self._tokens_reset_at = 0.0
+        # Created on first use so it binds to the event loop that runs the analysis
+        self._lock: Optional[asyncio.Lock] = None
+
+    def update(self, headers: Mapping[str, str]) -> None:
+        """Update the remaining budgets from a response's x-ratelimit-* headers."""
+        now = time.monotonic()
+        remaining_requests = headers.get("x-ratelimit-remaining-requests")
+        if remaining_requests is not None and remaining_requests.isdigit():
+            self.remaining_requests = int(remaining_requests)
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-requests", ""))
+            self._requests_reset_at = now + (reset or 0.0)
+
+        remaining_tokens = headers.get("x-ratelimit-remaining-tokens")
+        if remaining_tokens is not None and remaining_tokens.isdigit():
+            self.remaining_tokens = int(remaining_tokens)
+            reset = parse_reset_duration(headers.get("x-ratelimit-reset-tokens", ""))
+            self._tokens_reset_at = now + (reset or 0.0)
+
+    async def record_response(self, response) -> None:
+        """httpx response hook that feeds every API response into update()."""
+        self.update(response.headers)
+
+    async def acquire(self, estimated_tokens: int) -> None:
+        """
+        Wait until the budget allows one more request and reserve capacity for it.
+
+        Args:
+            estimated_tokens: Estimated prompt plus completion tokens for the request
+        """
+        if self._lock is None:
+            self._lock = asyncio.Lock()
+
+        # Waiters queue on the lock, so they are released in arrival order
+        async with self._lock:
+            while True:
+                now = time.monotonic()
+                # Once a window has reset the budget is unknown until the next response
+                if now >= self._requests_reset_at:
+                    self.remaining_requests = None
+                if now >= self._tokens_reset_at:
+                    self.remaining_tokens = None
+
+                delay = 0.0
+                if self.remaining_requests is not None and self.remaining_requests < 1:
+                    delay = max(delay, self._requests_reset_at - now)
+                if self.remaining_tokens is not None and self.remaining_tokens < estimated_tokens:
+                    delay = max(delay, self._tokens_reset_at - now)
+                if delay <= 0:
+                    break
+                await asyncio.sleep(delay)
+
+            if self.remaining_requests is not None:
+                self.remaining_requests -= 1
+            if self.remaining_tokens is not None:
+                self.remaining_tokens -= estimated_tokens
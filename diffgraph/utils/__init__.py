@@ -2,6 +2,6 @@
 Utility functions for the DiffGraph package.
 """
 
-from .git_utils import sanitize_diff_args, involves_working_tree
+from .git_utils import sanitize_diff_args, involves_working_tree, split_diff_by_file
 
-__all__ = ['sanitize_diff_args', 'involves_working_tree']
+__all__ = ['sanitize_diff_args', 'involves_working_tree', 'split_diff_by_file']
@@ -4,7 +4,8 @@ Git utility functions for safe command execution and argument sanitization.
 
 import click
 import os
-from typing import List, Tuple
+import io
+from typing import Dict, Iterable, List, Tuple, Union
 import re
 
 def sanitize_diff_args(diff_args: List[str]) -> Tuple[List[str], List[str]]:
@@ -103,4 +104,45 @@ def involves_working_tree(diff_args: List[str]) -> bool:
             return False
         return True
 
-    return False
\ No newline at end of file
+    return False
+
+def split_diff_by_file(diff_output: Union[str, Iterable[str]]) -> Dict[str, str]:
+    """
+    Split the output of a multi-file git diff into per-file patches.
+
+    Only sections whose header has the default "a/<path> b/<path>" form are
+    returned. Renames, copies, quoted paths and custom prefixes are left out,
+    so callers should diff those files individually.
+
+    Args:
+        diff_output: Output of git diff covering any number of files, either as
+            one string or as an iterable of lines (e.g. a process's stdout)
+
+    Returns:
+        Mapping of file path to that file's section of the diff
+    """
+    if isinstance(diff_output, str):
+        diff_output = io.StringIO(diff_output)
+
+    diffs = {}
+    section = []
+    for line in diff_output:
+        if line.startswith('diff --git ') and section:
+            _add_diff_section(diffs, section)
+            section = []
+        section.append(line)
+    if section:
+        _add_diff_section(diffs, section)
+    return diffs
+
+def _add_diff_section(diffs: Dict[str, str], section: List[str]) -> None:
+    """Add one file's diff section, given as lines, to diffs if its header names a single path."""
+    header = section[0].rstrip('\n')
+    if not header.startswith('diff --git '):
+        return
+    header = header[len('diff --git '):]
+    # Both paths are equal, so each half of the header is one of them
+    half = (len(header) - 1) // 2
+    old_path, new_path = header[:half], header[half + 1:]
+    if old_path.startswith('a/') and new_path.startswith('b/') and old_path[2:] == new_path[2:]:
+        diffs[new_path[2:]] = ''.join(section)
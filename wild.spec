@@ -0,0 +1,76 @@
+# -*- mode: python ; coding: utf-8 -*-
+# PyInstaller spec for the `wild` binary. Built via `python build.py`.
+import os
+import sys
+
+# UPX and strip shrink the binary (and one-file extraction time). Both stay
+# off on Windows, where UPX-packed binaries trip antivirus heuristics.
+compress = sys.platform != 'win32'
+
+# Bundle the .env file when present so the binary can load it at runtime
+datas = [('.env', '.')] if os.path.exists('.env') else []
+
+
+a = Analysis(
+    ['diffgraph/cli.py'],
+    pathex=[],
+    binaries=[],
+    datas=datas,
+    hiddenimports=[],
+    hookspath=[],
+    hooksconfig={},
+    runtime_hooks=[],
+    excludes=[],
+    noarchive=False,
+    # Compile bundled bytecode with -O (drops asserts). Level 2 would also
+    # strip docstrings, which click uses for the command help text.
+    optimize=1,
+)
+pyz = PYZ(a.pure)
+
+# DIFFGRAPH_DEV=1 builds a one-folder bundle for local development; it starts
+# instantly because nothing has to be extracted to a temp directory first.
+onedir = bool(os.environ.get('DIFFGRAPH_DEV'))
+
+exe_options = dict(
+    name='wild',
+    debug=False,
+    bootloader_ignore_signals=False,
+    strip=compress,
+    upx=compress,
+    upx_exclude=['vcruntime140.dll'],
+    console=True,
+    disable_windowed_traceback=False,
+    argv_emulation=False,
+    target_arch=None,
+    codesign_identity=None,
+    entitlements_file=None,
+)
+
+if onedir:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        [],
+        exclude_binaries=True,
+        **exe_options,
+    )
+    coll = COLLECT(
+        exe,
+        a.binaries,
+        a.datas,
+        strip=compress,
+        upx=compress,
+        upx_exclude=['vcruntime140.dll'],
+        name='wild',
+    )
+else:
+    exe = EXE(
+        pyz,
+        a.scripts,
+        a.binaries,
+        a.datas,
+        [],
+        runtime_tmpdir=None,
+        **exe_options,
+    )